@@ -1,13 +1,26 @@
+import asyncio
 import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 
+from services import timing
+
 SECRET_KEY = os.getenv("PORTAL_JWT_SECRET", "dev-secret-change-me")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = int(os.getenv("TOKEN_EXPIRE_HOURS", "24"))
+# bcrypt 전용 스레드 수 — 로그인이 몰려도 이 이상 CPU/스레드를 쓰지 않음
+AUTH_THREADS = int(os.getenv("AUTH_THREADS", "2"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+# SSE 연결용 티켓 — URL(액세스 로그)에 남으므로 수명을 짧게
+STREAM_TICKET_SECONDS = int(os.getenv("STREAM_TICKET_SECONDS", "60"))
+STREAM_SCOPE = "stream"
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -21,20 +34,96 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
+_hash_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(max_workers=AUTH_THREADS, thread_name_prefix="auth")
+    return _hash_executor
+
+
+async def _run_hash(fn, *args):
+    with timing.span("bcrypt"):
+        return await asyncio.get_running_loop().run_in_executor(_executor(), fn, *args)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hash(hash_password, password)
+
+
+def hash_password_pooled(password: str) -> str:
+    """hash_password on the auth pool, for sync (threadpool) handlers."""
+    return _executor().submit(hash_password, password).result()
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await _run_hash(verify_password, plain, hashed)
+
+
+def close_auth():
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
+
+
 def create_access_token(data: dict) -> str:
     expire = datetime.now(timezone.utc) + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
     return jwt.encode({**data, "exp": expire}, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def create_stream_ticket(user: dict) -> str:
+    """Short-lived token that only opens streaming endpoints."""
+    expire = datetime.now(timezone.utc) + timedelta(seconds=STREAM_TICKET_SECONDS)
+    claims = {"sub": user["sub"], "role": user["role"], "scope": STREAM_SCOPE, "exp": expire}
+    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
+
 def verify_token(token: str) -> dict:
     return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
+# 검증된 토큰 → (claims, exp). 토큰은 서명된 불변 값이므로 만료 전까지 재검증 불필요
+_token_cache: "OrderedDict[str, tuple[dict, float]]" = OrderedDict()
+
+
+def verify_token_cached(token: str) -> dict:
+    hit = _token_cache.get(token)
+    if hit is not None:
+        claims, exp = hit
+        if exp > time.time():
+            _token_cache.move_to_end(token)
+            return claims
+        del _token_cache[token]
+    claims = verify_token(token)
+    exp = claims.get("exp")
+    if TOKEN_CACHE_SIZE > 0 and isinstance(exp, (int, float)):
+        _token_cache[token] = (claims, exp)
+        if len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return claims
+
+
+def _verify_scope(token: str, scope: Optional[str]) -> dict:
     try:
-        return verify_token(token)
+        claims = verify_token_cached(token)
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    if claims.get("scope") != scope:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return claims
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
+    return _verify_scope(token, None)
+
+
+async def get_stream_user(ticket: str = Query(...)) -> dict:
+    """EventSource can't send headers, so streaming endpoints take ?ticket= from
+    POST /api/stream/ticket instead of the session token."""
+    return _verify_scope(ticket, STREAM_SCOPE)
 
 
 async def require_admin(user: dict = Depends(get_current_user)) -> dict:
@@ -0,0 +1,104 @@
+"""NumPy daily_stats vs the previous pure-Python _aggregate/_daily_stats.
+
+Synthetic year-long hourly series (as returned by query_range) for N servers.
+
+    cd portal && python -m benchmarks.bench_aggregation [--servers 500] [--days 366]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from services import aggregation
+
+TZ_KST = timezone(timedelta(hours=9))
+
+
+# --- previous implementation (routers/reports.py before the NumPy engine) ---
+
+def _ts_to_date(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=TZ_KST).strftime("%Y-%m-%d")
+
+
+def legacy_aggregate(results: list) -> dict:
+    data = {}
+    for r in results:
+        server = r["metric"].get("server_name", "unknown")
+        if server not in data:
+            data[server] = {}
+        for ts, val in r["values"]:
+            try:
+                v = float(val)
+                if v < 0:
+                    continue
+            except (ValueError, TypeError):
+                continue
+            data[server].setdefault(_ts_to_date(float(ts)), []).append(v)
+    return data
+
+
+def legacy_daily_stats(data: dict) -> dict:
+    result = {}
+    for server, dates in data.items():
+        result[server] = {}
+        for d, vals in dates.items():
+            if vals:
+                result[server][d] = {
+                    "avg": round(sum(vals) / len(vals), 2),
+                    "max": round(max(vals), 2),
+                }
+    return result
+
+
+# ---------------------------------------------------------------------------
+
+def synthetic_results(servers: int, days: int, step: int = 3600) -> list:
+    rnd = random.Random(42)
+    start = int(datetime(2025, 1, 1, tzinfo=TZ_KST).timestamp())
+    points = days * 86400 // step
+    return [
+        {
+            "metric": {"server_name": f"srv-{i:04d}"},
+            "values": [[start + j * step, f"{rnd.uniform(0, 100):.4f}"] for j in range(points)],
+        }
+        for i in range(servers)
+    ]
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(servers: int, days: int, repeat: int):
+    results = synthetic_results(servers, days)
+    samples = sum(len(r["values"]) for r in results)
+    print(f"{servers} servers x {days} days = {samples:,} samples (best of {repeat})")
+
+    legacy = legacy_daily_stats(legacy_aggregate(results))
+    fast = aggregation.daily_stats(results)
+    mismatches = sum(
+        1
+        for server, dates in legacy.items()
+        for d, st in dates.items()
+        if abs(fast[server][d]["avg"] - st["avg"]) > 0.011 or fast[server][d]["max"] != st["max"]
+    )
+    print(f"avg/max mismatches vs legacy: {mismatches}")
+
+    t_legacy = _time(lambda: legacy_daily_stats(legacy_aggregate(results)), repeat)
+    t_fast = _time(lambda: aggregation.daily_stats(results), repeat)
+    print(f"legacy  {t_legacy:8.3f}s")
+    print(f"numpy   {t_fast:8.3f}s  ({t_legacy / t_fast:.1f}x, also computes min/p95)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--servers", type=int, default=500)
+    parser.add_argument("--days", type=int, default=366)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.servers, args.days, args.repeat)
@@ -0,0 +1,152 @@
+"""Alert history queries: fingerprint-only table vs composite indexes + epoch columns.
+
+Builds a synthetic alert_history table in a temporary SQLite file, times the
+/api/alerts/history filter combinations against the original schema (string
+started_at, LIMIT/OFFSET for deep pages), then adds the indexes from
+models.AlertHistory and times the same filters using started_ts and keyset
+pagination.
+
+    cd portal && python -m benchmarks.bench_alert_history [--rows 5000000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.schema import CreateIndex
+
+from models import AlertHistory
+
+CUSTOMERS = 50
+SERVERS_PER_CUSTOMER = 40
+ALERTS = ["ServerDown", "HighCPU", "HighMemory", "DiskFull"]
+START = int(datetime(2023, 1, 1, tzinfo=timezone.utc).timestamp())
+SPAN = 3 * 365 * 86400
+
+TABLE = """
+CREATE TABLE alert_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fingerprint TEXT, customer_id TEXT, server_name TEXT, alert_name TEXT,
+    status TEXT, severity TEXT, message TEXT,
+    started_at TEXT, resolved_at TEXT, started_ts INTEGER, resolved_ts INTEGER,
+    received_at TEXT
+)
+"""
+
+
+def _iso(ts: int) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def build(path: str, rows: int):
+    rnd = random.Random(7)
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode=OFF")
+    db.execute("PRAGMA synchronous=OFF")
+    db.execute(TABLE)
+    db.execute("CREATE INDEX ix_alert_history_fingerprint ON alert_history (fingerprint)")
+    batch = []
+    for i in range(rows):
+        # id 순서 ≈ 발생 순서 (웹훅 수신 순)
+        started = START + SPAN * i // rows + rnd.randrange(600)
+        cid = f"customer-{rnd.randrange(CUSTOMERS):02d}"
+        srv = f"{cid}-srv-{rnd.randrange(SERVERS_PER_CUSTOMER):02d}"
+        resolved = rnd.random() > 0.01
+        ended = started + rnd.randrange(60, 7200) if resolved else None
+        batch.append((
+            f"{rnd.getrandbits(64):016x}", cid, srv, rnd.choice(ALERTS),
+            "resolved" if resolved else "firing", rnd.choice(["critical", "warning"]), "",
+            _iso(started), _iso(ended) if ended else None, started, ended, _iso(started),
+        ))
+        if len(batch) == 100_000:
+            db.executemany(
+                "INSERT INTO alert_history (fingerprint, customer_id, server_name, alert_name, status, "
+                "severity, message, started_at, resolved_at, started_ts, resolved_ts, received_at) "
+                "VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", batch,
+            )
+            batch.clear()
+    if batch:
+        db.executemany(
+            "INSERT INTO alert_history (fingerprint, customer_id, server_name, alert_name, status, "
+            "severity, message, started_at, resolved_at, started_ts, resolved_ts, received_at) "
+            "VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", batch,
+        )
+    db.commit()
+    return db
+
+
+def add_indexes(db: sqlite3.Connection):
+    for index in AlertHistory.__table__.indexes:
+        if index.name == "ix_alert_history_fingerprint":
+            continue
+        db.execute(str(CreateIndex(index).compile()))
+    db.commit()
+
+
+def _day(value: str) -> int:
+    return int(datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+
+
+def cases(rows: int, new: bool) -> list[tuple[str, str, tuple]]:
+    base = "SELECT * FROM alert_history WHERE 1=1"
+    order = " ORDER BY id DESC LIMIT 200"
+    day_from, day_to = "2024-06-01", "2024-06-07"
+    if new:
+        date_range = (" AND started_ts >= ? AND started_ts < ?", (_day(day_from), _day(day_to) + 86400))
+        deep = (" AND id < ?", (rows // 10,))
+    else:
+        date_range = (" AND started_at >= ? AND started_at <= ?", (day_from, day_to + "T23:59:59Z"))
+        deep = ("", ())
+    deep_order = order if new else order + f" OFFSET {rows - rows // 10}"
+    return [
+        ("latest page", base + order, ()),
+        ("customer", base + " AND customer_id = ?" + order, ("customer-07",)),
+        ("customer+server", base + " AND customer_id = ? AND server_name = ?" + order,
+         ("customer-07", "customer-07-srv-03")),
+        ("customer+status=firing", base + " AND customer_id = ? AND status = ?" + order,
+         ("customer-07", "firing")),
+        ("status=firing", base + " AND status = ?" + order, ("firing",)),
+        ("date range (1w)", base + date_range[0] + order, date_range[1]),
+        ("customer+date range", base + " AND customer_id = ?" + date_range[0] + order,
+         ("customer-07",) + date_range[1]),
+        ("deep page (90%)", base + deep[0] + deep_order, deep[1]),
+    ]
+
+
+def _time(db: sqlite3.Connection, sql: str, params: tuple, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        db.execute(sql, params).fetchall()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(rows: int, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.db")
+        t0 = time.perf_counter()
+        db = build(path, rows)
+        print(f"built {rows:,} rows in {time.perf_counter() - t0:.1f}s")
+
+        legacy = {name: _time(db, sql, p, repeat) for name, sql, p in cases(rows, new=False)}
+        t0 = time.perf_counter()
+        add_indexes(db)
+        print(f"indexes built in {time.perf_counter() - t0:.1f}s, db {os.path.getsize(path) / 2**20:.0f} MiB")
+        indexed = {name: _time(db, sql, p, repeat) for name, sql, p in cases(rows, new=True)}
+
+        print(f"\n{'query':<24}{'before':>12}{'after':>12}")
+        for name in legacy:
+            print(f"{name:<24}{legacy[name] * 1000:>10.1f}ms{indexed[name] * 1000:>10.2f}ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
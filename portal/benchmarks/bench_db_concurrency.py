@@ -0,0 +1,170 @@
+"""Alert history reads while webhooks are being written: WAL vs rollback journal.
+
+Starts the portal under uvicorn twice against a pre-seeded SQLite file, once
+with the old settings (journal_mode=DELETE, synchronous=FULL) and once with
+the defaults (WAL, synchronous=NORMAL). For each run it posts Alertmanager
+webhooks from several concurrent clients, reads /api/alerts/history from
+several others, and reports read latency and alerts written per second.
+
+    cd portal && python -m benchmarks.bench_db_concurrency [--seconds 15] [--seed-rows 200000]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+PORTAL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CUSTOMERS = 20
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed(path: str, rows: int):
+    """Create the schema via init_db and bulk-load resolved history rows."""
+    code = f"""
+import sqlite3, time
+import main
+main.init_db()
+db = sqlite3.connect({path!r})
+now = int(time.time())
+db.executemany(
+    "INSERT INTO alert_history (fingerprint, customer_id, server_name, alert_name, status, severity, "
+    "message, started_at, resolved_at, started_ts, resolved_ts) VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+    ((f"seed{{i}}", f"customer-{{i % {CUSTOMERS}:02d}}", f"srv-{{i % 400:03d}}", "ServerDown", "resolved",
+      "critical", "", "", "", now - i * 30, now - i * 30 + 60) for i in range({rows})),
+)
+db.commit()
+"""
+    env = {**os.environ, "DB_PATH": path}
+    subprocess.run([sys.executable, "-c", code], cwd=PORTAL_DIR, env=env, check=True, capture_output=True)
+
+
+def _alert(i: int, status: str) -> dict:
+    return {
+        "fingerprint": f"bench{i}",
+        "status": status,
+        "labels": {
+            "customer_id": f"customer-{i % CUSTOMERS:02d}", "server_name": f"srv-{i % 400:03d}",
+            "alertname": "ServerDown", "severity": "critical",
+        },
+        "annotations": {"description": "bench"},
+        "startsAt": "2026-01-01T00:00:00Z",
+        "endsAt": "2026-01-01T00:05:00Z" if status == "resolved" else "0001-01-01T00:00:00Z",
+    }
+
+
+async def _workload(url: str, seconds: float, writers: int, readers: int, batch: int) -> dict:
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        resp = await client.post("/api/auth/login", json={
+            "username": os.getenv("PORTAL_INIT_USER", "admin"),
+            "password": os.getenv("PORTAL_INIT_PASSWORD", "changeme123"),
+        })
+        headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+        deadline = time.perf_counter() + seconds
+        reads: list[float] = []
+        posts: list[float] = []
+        counter = iter(range(10**9))
+
+        async def writer():
+            while time.perf_counter() < deadline:
+                base = next(counter) * batch
+                alerts = [_alert(base + j, "firing") for j in range(batch)]
+                alerts += [_alert(base + j, "resolved") for j in range(0, batch, 2)]
+                t0 = time.perf_counter()
+                (await client.post("/api/alerts/webhook", json={"alerts": alerts})).raise_for_status()
+                posts.append(time.perf_counter() - t0)
+
+        async def reader(n: int):
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                (await client.get("/api/alerts/history", headers=headers, params={
+                    "customer_id": f"customer-{n % CUSTOMERS:02d}", "limit": 200,
+                })).raise_for_status()
+                reads.append(time.perf_counter() - t0)
+
+        await asyncio.gather(*(writer() for _ in range(writers)), *(reader(n) for n in range(readers)))
+        await asyncio.sleep(2)  # writer 큐가 비워질 시간
+        stats = (await client.get("/api/alerts/webhook/stats", headers=headers)).json()
+    return {"reads": reads, "posts": posts, "stats": stats}
+
+
+def _pct(samples: list[float], q: float) -> float:
+    if not samples:
+        return float("nan")
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))] * 1000
+
+
+def run(label: str, db_path: str, env_extra: dict, args) -> dict:
+    port = _free_port()
+    env = {
+        **os.environ, **env_extra, "DB_PATH": db_path,
+        "FLEET_REFRESH_INTERVAL": "3600",
+        "VICTORIAMETRICS_URL": "http://127.0.0.1:9", "ALERTMANAGER_URL": "http://127.0.0.1:9",
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PORTAL_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        for _ in range(100):
+            try:
+                httpx.get(f"{url}/api/health", timeout=1)
+                break
+            except httpx.TransportError:
+                time.sleep(0.2)
+        result = asyncio.run(_workload(url, args.seconds, args.writers, args.readers, args.batch))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    reads, posts, stats = result["reads"], result["posts"], result["stats"]
+    print(
+        f"{label:<22} reads={len(reads):<6} p50={_pct(reads, 0.5):7.1f}ms "
+        f"p99={_pct(reads, 0.99):8.1f}ms max={_pct(reads, 1):8.1f}ms | "
+        f"webhook p99={_pct(posts, 0.99):6.1f}ms | written {stats['written_alerts'] / args.seconds:8.0f} alerts/s "
+        f"flush avg={stats['avg_flush_ms']}ms max={stats['max_flush_ms']}ms"
+    )
+    return result
+
+
+def main(args):
+    tmp = tempfile.mkdtemp(prefix="portal-bench-")
+    try:
+        base = os.path.join(tmp, "seed.db")
+        t0 = time.perf_counter()
+        seed(base, args.seed_rows)
+        print(f"seeded {args.seed_rows:,} rows in {time.perf_counter() - t0:.1f}s; "
+              f"{args.writers} webhook writers x {args.batch} alerts, {args.readers} history readers, {args.seconds}s")
+        modes = [
+            ("DELETE/FULL (before)", {"DB_JOURNAL_MODE": "DELETE", "DB_SYNCHRONOUS": "FULL"}),
+            ("WAL/NORMAL (after)", {}),
+        ]
+        for label, env_extra in modes:
+            path = os.path.join(tmp, f"{label.split()[0].replace('/', '_')}.db")
+            shutil.copy(base, path)
+            run(label, path, env_extra, args)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--seed-rows", type=int, default=200_000)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=50)
+    main(parser.parse_args())
@@ -0,0 +1,248 @@
+"""End-to-end load test of the portal against a synthetic fleet, fully offline.
+
+Starts FleetVictoriaMetricsStub and AlertmanagerStub (benchmarks/stubs.py) in
+a separate process for a customers × servers fleet. It then starts the real
+app under uvicorn pointed at them, and drives each scenario with concurrent
+clients for a fixed time:
+
+    servers   GET  /api/servers
+    webhook   POST /api/alerts/webhook   (Alertmanager payloads, firing + resolved)
+    history   GET  /api/alerts/history   (per customer, first page and a deeper keyset page)
+    reports   GET  /api/reports/range    (random customer, last --report-days days, daily mode)
+
+Throughput and p50/p90/p99 per scenario are printed and written to --out as
+JSON, so runs can be compared across changes.
+
+    cd portal && python -m benchmarks.bench_load [--customers 200] [--servers 50] \\
+        [--seconds 15] [--concurrency 8] [--scenarios servers,webhook,history,reports] [--out bench_load.json]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import httpx
+
+from benchmarks.bench_db_concurrency import PORTAL_DIR, _free_port, _pct
+from benchmarks.stubs import AlertmanagerStub, FleetVictoriaMetricsStub, SyntheticFleet
+
+SCENARIOS = ("servers", "webhook", "history", "reports")
+USER = os.getenv("PORTAL_INIT_USER", "admin")
+PASSWORD = os.getenv("PORTAL_INIT_PASSWORD", "changeme123")
+
+
+def _serve_stubs(customers: int, servers: int, ready, stop):
+    fleet = SyntheticFleet(customers, servers)
+    vm = FleetVictoriaMetricsStub(fleet).start()
+    am = AlertmanagerStub(fleet).start()
+    ready.put({"vm": vm.url, "am": am.url})
+    stop.wait()
+    vm.stop()
+    am.stop()
+
+
+def _alert(fleet: SyntheticFleet, i: int, status: str) -> dict:
+    cid = fleet.customers[i % len(fleet.customers)]
+    server = fleet.servers[cid][(i // len(fleet.customers)) % len(fleet.servers[cid])]
+    return {
+        "fingerprint": f"load-{i}",
+        "status": status,
+        "labels": {"customer_id": cid, "server_name": server, "alertname": "HighCPU", "severity": "warning"},
+        "annotations": {"description": "CPU > 90% for 3 minutes"},
+        "startsAt": "2026-01-01T00:00:00Z",
+        "endsAt": "2026-01-01T00:10:00Z" if status == "resolved" else "0001-01-01T00:00:00Z",
+    }
+
+
+async def _scenario(client: httpx.AsyncClient, name: str, fleet: SyntheticFleet, args) -> dict:
+    rng = random.Random(0)
+    counter = iter(range(10**9))
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+    units = 0  # alerts (webhook) or requests
+
+    async def call(method: str, url: str, **kw) -> httpx.Response:
+        t0 = time.perf_counter()
+        try:
+            resp = await client.request(method, url, **kw)
+        except httpx.HTTPError as e:
+            errors[e.__class__.__name__] = errors.get(e.__class__.__name__, 0) + 1
+            return None
+        latencies.append(time.perf_counter() - t0)
+        if resp.status_code >= 400:
+            errors[str(resp.status_code)] = errors.get(str(resp.status_code), 0) + 1
+        return resp
+
+    last = date.today()
+    first = last - timedelta(days=args.report_days - 1)
+
+    async def worker():
+        nonlocal units
+        while time.perf_counter() < deadline:
+            if name == "servers":
+                await call("GET", "/api/servers")
+                units += 1
+            elif name == "webhook":
+                base = next(counter) * args.webhook_batch
+                alerts = [_alert(fleet, base + j, "firing") for j in range(args.webhook_batch)]
+                if base:  # 직전 배치의 절반을 해소
+                    alerts += [
+                        _alert(fleet, base - args.webhook_batch + j, "resolved")
+                        for j in range(0, args.webhook_batch, 2)
+                    ]
+                await call("POST", "/api/alerts/webhook", json={"alerts": alerts})
+                units += len(alerts)
+            elif name == "history":
+                cid = rng.choice(fleet.customers)
+                resp = await call("GET", "/api/alerts/history", params={"customer_id": cid, "limit": 200})
+                cursor = resp.headers.get("X-Next-Cursor") if resp is not None else None
+                if cursor:
+                    await call("GET", "/api/alerts/history", params={"customer_id": cid, "limit": 200, "before_id": cursor})
+                units += 1
+            elif name == "reports":
+                await call("GET", "/api/reports/range", params={
+                    "customer_id": rng.choice(fleet.customers),
+                    "from_date": first.isoformat(), "to_date": last.isoformat(),
+                }, timeout=300)
+                units += 1
+
+    deadline = time.perf_counter() + args.seconds
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    wall = time.perf_counter() - t0
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall, 2),
+        "p50_ms": round(_pct(latencies, 0.5), 2),
+        "p90_ms": round(_pct(latencies, 0.9), 2),
+        "p99_ms": round(_pct(latencies, 0.99), 2),
+        "max_ms": round(_pct(latencies, 1), 2),
+    }
+    if name == "webhook":
+        result["alerts_per_s"] = round(units / wall, 1)
+    return result
+
+
+async def _drive(url: str, fleet: SyntheticFleet, args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limits) as client:
+        resp = await client.post("/api/auth/login", json={"username": USER, "password": PASSWORD})
+        client.headers["Authorization"] = f"Bearer {resp.json()['access_token']}"
+        await client.get("/api/servers")  # 첫 스냅샷 적재
+        results = {}
+        for name in args.scenarios:
+            results[name] = await _scenario(client, name, fleet, args)
+            r = results[name]
+            print(
+                f"{name:<8} n={r['requests']:<6} {r['throughput_rps']:8.1f} req/s "
+                f"p50={r['p50_ms']:8.1f}ms p90={r['p90_ms']:8.1f}ms p99={r['p99_ms']:8.1f}ms"
+                + (f" {r['alerts_per_s']:8.0f} alerts/s" if "alerts_per_s" in r else "")
+                + (f" errors={r['errors']}" if r["errors"] else "")
+            )
+            if name == "webhook":
+                await asyncio.sleep(2)  # writer 큐가 비워질 시간
+        results["webhook_writer"] = (await client.get("/api/alerts/webhook/stats")).json()
+    return results
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PORTAL_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(args):
+    ctx = multiprocessing.get_context("spawn")
+    ready, stop = ctx.Queue(), ctx.Event()
+    stubs = ctx.Process(target=_serve_stubs, args=(args.customers, args.servers, ready, stop), daemon=True)
+    stubs.start()
+    urls = ready.get(timeout=60)
+
+    tmp = tempfile.mkdtemp(prefix="portal-bench-")
+    port = _free_port()
+    env = {
+        **os.environ,
+        "DB_PATH": os.path.join(tmp, "portal.db"),
+        "CONFIG_DIR": os.path.join(tmp, "config"),
+        "VICTORIAMETRICS_URL": urls["vm"],
+        "ALERTMANAGER_URL": urls["am"],
+        "VMALERT_URL": "http://127.0.0.1:9", "GRAFANA_URL": "http://127.0.0.1:9",
+        "DOCKER_SOCKET": os.path.join(tmp, "docker.sock"),
+        "CERT_HOSTNAME": "localhost",
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PORTAL_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        for _ in range(300):
+            try:
+                httpx.get(f"{url}/api/auth/me", timeout=1)
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        fleet = SyntheticFleet(args.customers, args.servers)
+        print(
+            f"fleet {args.customers} customers x {args.servers} servers, "
+            f"{args.concurrency} clients, {args.seconds}s per scenario"
+        )
+        results = asyncio.run(_drive(url, fleet, args))
+    finally:
+        proc.terminate()
+        proc.wait()
+        stop.set()
+        stubs.join(timeout=10)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "git": _git_rev(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "customers": args.customers,
+            "servers_per_customer": args.servers,
+            "seconds": args.seconds,
+            "concurrency": args.concurrency,
+            "webhook_batch": args.webhook_batch,
+            "report_days": args.report_days,
+        },
+        "scenarios": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--servers", type=int, default=50, help="servers per customer")
+    parser.add_argument("--seconds", type=float, default=15, help="per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--webhook-batch", type=int, default=50)
+    parser.add_argument("--report-days", type=int, default=7)
+    parser.add_argument(
+        "--scenarios", type=lambda v: [s for s in v.split(",") if s], default=list(SCENARIOS),
+        help="comma-separated: " + ",".join(SCENARIOS),
+    )
+    parser.add_argument("--out", default="bench_load.json")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    main(args)
@@ -0,0 +1,96 @@
+"""Latency of ordinary API calls while a burst of logins is running.
+
+Starts the portal under uvicorn and has several clients call /api/auth/me and
+/api/alerts/history in a loop, first alone and then while other clients log in
+as fast as they can (bcrypt on every login). Reports p50/p99 for the ordinary
+calls in both phases, and login throughput.
+
+    cd portal && python -m benchmarks.bench_login_storm [--seconds 10] [--logins 32] [--readers 8]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.bench_db_concurrency import PORTAL_DIR, _free_port, _pct
+
+USER = os.getenv("PORTAL_INIT_USER", "admin")
+PASSWORD = os.getenv("PORTAL_INIT_PASSWORD", "changeme123")
+
+
+async def _phase(url: str, token: str, seconds: float, readers: int, logins: int) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    reads: list[float] = []
+    login_times: list[float] = []
+    limits = httpx.Limits(max_connections=readers + logins)
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as client:
+        deadline = time.perf_counter() + seconds
+
+        async def reader(n: int):
+            path = "/api/auth/me" if n % 2 else "/api/alerts/history"
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                (await client.get(path, headers=headers, params={"limit": 50} if n % 2 == 0 else None)).raise_for_status()
+                reads.append(time.perf_counter() - t0)
+
+        async def login():
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                (await client.post("/api/auth/login", json={"username": USER, "password": PASSWORD})).raise_for_status()
+                login_times.append(time.perf_counter() - t0)
+
+        await asyncio.gather(*(reader(n) for n in range(readers)), *(login() for _ in range(logins)))
+    return {"reads": reads, "logins": login_times}
+
+
+def _report(label: str, result: dict, seconds: float):
+    reads, logins = result["reads"], result["logins"]
+    line = (
+        f"{label:<14} api calls={len(reads):<6} p50={_pct(reads, 0.5):7.1f}ms "
+        f"p99={_pct(reads, 0.99):8.1f}ms max={_pct(reads, 1):8.1f}ms"
+    )
+    if logins:
+        line += f" | logins {len(logins) / seconds:6.1f}/s p99={_pct(logins, 0.99):8.1f}ms"
+    print(line)
+
+
+def main(args):
+    tmp = tempfile.mkdtemp(prefix="portal-bench-")
+    port = _free_port()
+    env = {
+        **os.environ, "DB_PATH": os.path.join(tmp, "portal.db"),
+        "FLEET_REFRESH_INTERVAL": "3600",
+        "VICTORIAMETRICS_URL": "http://127.0.0.1:9", "ALERTMANAGER_URL": "http://127.0.0.1:9",
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PORTAL_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        for _ in range(100):
+            try:
+                httpx.get(f"{url}/api/health", timeout=1)
+                break
+            except httpx.TransportError:
+                time.sleep(0.2)
+        token = httpx.post(f"{url}/api/auth/login", json={"username": USER, "password": PASSWORD}, timeout=30).json()["access_token"]
+        print(f"{args.readers} API clients, {args.logins} login clients, {args.seconds}s per phase")
+        _report("idle", asyncio.run(_phase(url, token, args.seconds, args.readers, 0)), args.seconds)
+        _report("login storm", asyncio.run(_phase(url, token, args.seconds, args.readers, args.logins)), args.seconds)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--readers", type=int, default=8)
+    main(parser.parse_args())
@@ -0,0 +1,70 @@
+"""Time from launching the portal to its first successful request.
+
+Starts uvicorn against an empty database (first install) and then restarts it
+several times against the same file (upgrade / `make restart`), polling
+an API route until it answers (uvicorn only accepts connections once the
+lifespan startup has finished). Reports each phase's time-to-first-request.
+
+    cd portal && python -m benchmarks.bench_startup [--restarts 5]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.bench_db_concurrency import PORTAL_DIR, _free_port
+
+
+def time_to_first_request(db_path: str, timeout: float = 60) -> float:
+    port = _free_port()
+    env = {
+        **os.environ, "DB_PATH": db_path,
+        "FLEET_REFRESH_INTERVAL": "3600",
+        "VICTORIAMETRICS_URL": "http://127.0.0.1:9", "ALERTMANAGER_URL": "http://127.0.0.1:9",
+    }
+    url = f"http://127.0.0.1:{port}/api/auth/me"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PORTAL_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=1) as client:
+            while time.perf_counter() - t0 < timeout:
+                try:
+                    client.get(url)  # 401 — 응답만 오면 됨
+                    return time.perf_counter() - t0
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+        raise TimeoutError("portal did not start")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main(args):
+    tmp = tempfile.mkdtemp(prefix="portal-bench-")
+    try:
+        db_path = os.path.join(tmp, "portal.db")
+        first = time_to_first_request(db_path)
+        restarts = [time_to_first_request(db_path) for _ in range(args.restarts)]
+        print(f"first start (empty DB)  {first * 1000:7.0f}ms")
+        print(
+            f"restart x{args.restarts:<3}           median {statistics.median(restarts) * 1000:7.0f}ms "
+            f"min {min(restarts) * 1000:7.0f}ms max {max(restarts) * 1000:7.0f}ms"
+        )
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--restarts", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,77 @@
+"""Per-call httpx.AsyncClient vs the shared pooled upstream client.
+
+    cd portal && python -m benchmarks.bench_upstream_pool [--requests 500] [--concurrency 10]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+from benchmarks.stubs import VictoriaMetricsStub
+
+
+def _summary(label: str, samples: list[float], wall: float):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(
+        f"{label:<12} n={len(samples):<5} wall={wall:7.3f}s "
+        f"mean={statistics.mean(samples) * 1000:7.2f}ms "
+        f"p50={statistics.median(samples) * 1000:7.2f}ms p99={p99 * 1000:7.2f}ms"
+    )
+
+
+async def _run(call, total: int, concurrency: int) -> tuple[list[float], float]:
+    sem = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one():
+        async with sem:
+            t0 = time.perf_counter()
+            await call()
+            samples.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return samples, time.perf_counter() - t0
+
+
+async def main(total: int, concurrency: int):
+    stub = VictoriaMetricsStub().start()
+    os.environ["VICTORIAMETRICS_URL"] = stub.url
+    from services import upstream  # picks up the stub URL
+
+    params = {"query": "up"}
+
+    async def per_call():
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            resp = await client.get(f"{stub.url}/api/v1/query", params=params)
+            resp.raise_for_status()
+
+    async def pooled():
+        resp = await upstream.get_client(upstream.VICTORIAMETRICS).get("/api/v1/query", params=params)
+        resp.raise_for_status()
+
+    try:
+        await upstream.init_clients()
+        # warm up both paths
+        await _run(per_call, 10, 1)
+        await _run(pooled, 10, 1)
+
+        for c in (1, concurrency):
+            print(f"-- concurrency={c}")
+            _summary("per-call", *await _run(per_call, total, c))
+            _summary("pooled", *await _run(pooled, total, c))
+    finally:
+        await upstream.close_clients()
+        stub.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
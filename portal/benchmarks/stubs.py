@@ -0,0 +1,194 @@
+"""Lightweight local stand-ins for upstream services used by the benchmarks.
+
+Runs a threaded HTTP/1.1 server (keep-alive capable) in a background thread.
+FleetVictoriaMetricsStub and AlertmanagerStub serve a SyntheticFleet so the
+portal can be driven end to end without a live stack (see bench_load).
+"""
+import json
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, payload, status: int = 200):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self._send_json(self.server.route("GET", url.path, parse_qs(url.query), None))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        self._send_json(self.server.route("POST", url.path, parse_qs(url.query), body))
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def route(self, method: str, path: str, params: dict, body) -> object:
+        return {"status": "success", "data": {"resultType": "vector", "result": []}}
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class VictoriaMetricsStub(StubServer):
+    """Answers instant queries with a single sample."""
+
+    def route(self, method, path, params, body):
+        now = time.time()
+        return {
+            "status": "success",
+            "data": {
+                "resultType": "vector",
+                "result": [{"metric": {"customer_id": "bench", "server_name": "srv"}, "value": [now, str(now)]}],
+            },
+        }
+
+
+class SyntheticFleet:
+    """customers × servers_per_customer servers with deterministic, plausible metrics."""
+
+    def __init__(self, customers: int = 200, servers_per_customer: int = 50,
+                 offline_ratio: float = 0.02, firing_ratio: float = 0.05):
+        self.customers = [f"cust-{c:03d}" for c in range(customers)]
+        self.servers = {cid: [f"srv-{s:03d}" for s in range(servers_per_customer)] for cid in self.customers}
+        self.offline_ratio = offline_ratio
+        self.firing_ratio = firing_ratio
+
+    def all_servers(self):
+        for cid in self.customers:
+            for name in self.servers[cid]:
+                yield cid, name
+
+    @staticmethod
+    def _hash(*parts) -> int:
+        return zlib.crc32("/".join(map(str, parts)).encode())
+
+    def value(self, cid: str, server: str, query: str, ts: float) -> float:
+        # 서버·쿼리별로 고정된 기준값 + 시간에 따른 변동
+        base = self._hash(cid, server, query) % 60 + 10
+        return round(base + (self._hash(server, int(ts) // 3600) % 200) / 10, 2)
+
+    def offline(self, cid: str, server: str) -> bool:
+        return self._hash("offline", cid, server) % 1000 < self.offline_ratio * 1000
+
+    def firing(self, cid: str, server: str) -> bool:
+        return self._hash("firing", cid, server) % 1000 < self.firing_ratio * 1000
+
+
+_CUSTOMER = re.compile(r'customer_id="([^"]+)"')
+
+
+class FleetVictoriaMetricsStub(StubServer):
+    """Answers the VictoriaMetrics APIs the portal uses for a SyntheticFleet:
+    /api/v1/label/customer_id/values, /api/v1/series, /api/v1/query,
+    /api/v1/query_range, plus write endpoints (import, delete_series).
+    """
+
+    def __init__(self, fleet: SyntheticFleet, port: int = 0):
+        super().__init__(port)
+        self.fleet = fleet
+        self._customers = json.dumps({"status": "success", "data": fleet.customers}).encode()
+        self._series = json.dumps({"status": "success", "data": [
+            {"__name__": "node_uname_info", "customer_id": cid, "server_name": name}
+            for cid, name in fleet.all_servers()
+        ]}).encode()
+
+    def _targets(self, query: str):
+        m = _CUSTOMER.search(query)
+        if m:
+            return [(m.group(1), name) for name in self.fleet.servers.get(m.group(1), [])]
+        return list(self.fleet.all_servers())
+
+    def _last_seen(self):
+        now = time.time()
+        return [
+            {"metric": {"customer_id": cid, "server_name": name},
+             "value": [now, str(now - (3600 if self.fleet.offline(cid, name) else 15))]}
+            for cid, name in self.fleet.all_servers()
+        ]
+
+    def route(self, method, path, params, body):
+        if method == "POST":
+            return {"status": "success"}
+        if path == "/api/v1/label/customer_id/values":
+            return self._customers
+        if path == "/api/v1/series":
+            return self._series
+        query = params.get("query", [""])[0]
+        if path == "/api/v1/query":
+            if "timestamp(node_uname_info)" in query:
+                result = self._last_seen()
+            else:
+                ts = float(params.get("time", [time.time()])[0])
+                result = [
+                    {"metric": {"customer_id": cid, "server_name": name},
+                     "value": [ts, str(self.fleet.value(cid, name, query, ts))]}
+                    for cid, name in self._targets(query)
+                ]
+            return {"status": "success", "data": {"resultType": "vector", "result": result}}
+        if path == "/api/v1/query_range":
+            start, end = float(params["start"][0]), float(params["end"][0])
+            step = max(float(params.get("step", ["3600"])[0]), 1)
+            steps = [start + i * step for i in range(int((end - start) // step) + 1)]
+            result = [
+                {"metric": {"customer_id": cid, "server_name": name},
+                 "values": [[ts, str(self.fleet.value(cid, name, query, ts))] for ts in steps]}
+                for cid, name in self._targets(query)
+            ]
+            return {"status": "success", "data": {"resultType": "matrix", "result": result}}
+        return {"status": "success", "data": []}
+
+
+class AlertmanagerStub(StubServer):
+    """/api/v2/alerts with the fleet's firing alerts; accepts /-/reload."""
+
+    def __init__(self, fleet: SyntheticFleet, port: int = 0):
+        super().__init__(port)
+        starts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - 600))
+        self._alerts = json.dumps([
+            {
+                "labels": {"alertname": "HighCPU", "customer_id": cid, "server_name": name, "severity": "warning"},
+                "startsAt": starts,
+                "status": {"state": "active"},
+                "fingerprint": f"{SyntheticFleet._hash('fp', cid, name):016x}",
+            }
+            for cid, name in fleet.all_servers() if fleet.firing(cid, name)
+        ]).encode()
+
+    def route(self, method, path, params, body):
+        if path == "/api/v2/alerts":
+            return self._alerts
+        return {"status": "success"}
@@ -1,19 +1,97 @@
+import asyncio
+import contextvars
 import os
-from sqlalchemy import create_engine
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from services import timing
+
 DB_PATH = os.getenv("DB_PATH", "/app/data/portal.db")
 os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 
+JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL")
+SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_THREADS = int(os.getenv("DB_THREADS", "8"))
+
 engine = create_engine(
     f"sqlite:///{DB_PATH}",
     connect_args={"check_same_thread": False},
+    pool_size=POOL_SIZE,
+    max_overflow=POOL_SIZE,
 )
 
+
+@event.listens_for(engine, "connect")
+def _set_pragmas(dbapi_conn, _record):
+    # WAL: 읽기가 쓰기를 기다리지 않음. NORMAL은 WAL에서 커밋마다 fsync하지 않음(전원 장애 시 마지막 커밋만 유실 가능)
+    cur = dbapi_conn.cursor()
+    # 빈 새 DB에서만 적용됨 (WAL 전환 전에 설정해야 함) — retention의 incremental_vacuum용
+    cur.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    cur.execute(f"PRAGMA journal_mode={JOURNAL_MODE}")
+    cur.execute(f"PRAGMA synchronous={SYNCHRONOUS}")
+    cur.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    cur.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    cur.close()
+
+
+# 시작 시각은 문장별 실행 컨텍스트에 — 실패한 문장은 after_cursor_execute가 오지 않음
+@event.listens_for(engine, "before_cursor_execute")
+def _query_start(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _record_query(context):
+    started = getattr(context, "_query_start", None)
+    if started is not None:
+        timing.record("db", time.perf_counter() - started)
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _query_end(conn, cursor, statement, parameters, context, executemany):
+    _record_query(context)
+
+
+@event.listens_for(engine, "handle_error")
+def _query_failed(exception_context):
+    # 잠금 대기(busy_timeout) 후 실패한 시간도 db 구간에 포함
+    _record_query(exception_context.execution_context)
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# 이벤트 루프를 막지 않도록 async 핸들러의 DB 작업을 돌리는 전용 스레드 풀
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+async def run_db(fn, *args, **kwargs):
+    """Run a blocking DB function on the bounded DB thread pool."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="db")
+    loop = asyncio.get_running_loop()
+    # contextvars 전달 — 쿼리 시간이 요청의 Server-Timing에 잡히도록
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, partial(ctx.run, fn, *args, **kwargs))
+
+
+def close_db():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+    engine.dispose()
+
 
 def get_db():
     db = SessionLocal()
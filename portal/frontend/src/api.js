@@ -118,6 +118,36 @@ export const api = {
     URL.revokeObjectURL(url);
   },
 
+  startBulkReport: (fromDate, toDate, customerIds = null) =>
+    apiFetch('/api/reports/bulk', {
+      method: 'POST',
+      body: JSON.stringify({ from_date: fromDate, to_date: toDate, customer_ids: customerIds }),
+    }),
+  getBulkReport: (jobId) => apiFetch(`/api/reports/bulk/${jobId}`),
+  downloadBulkReport: async (jobId, filename) => {
+    const token = getToken();
+    const resp = await fetch(`/api/reports/bulk/${jobId}/download`, {
+      headers: token ? { Authorization: `Bearer ${token}` } : {},
+    });
+    if (!resp.ok) {
+      const err = await resp.json().catch(() => ({ detail: 'Download failed' }));
+      throw new Error(err.detail || 'Download failed');
+    }
+    const blob = await resp.blob();
+    const url = URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = filename;
+    a.click();
+    URL.revokeObjectURL(url);
+  },
+
+  // EventSource는 헤더를 못 보내므로 단기 티켓을 발급받아 쿼리로 전달 (세션 토큰은 URL에 싣지 않음)
+  streamFleet: async () => {
+    const { ticket } = await apiFetch('/api/stream/ticket', { method: 'POST' });
+    return new EventSource(`/api/stream/fleet?ticket=${encodeURIComponent(ticket)}`);
+  },
+
   // System
   getSystemStatus: () => apiFetch('/api/system/status'),
   restartService: (service) =>
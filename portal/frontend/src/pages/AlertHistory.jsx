@@ -20,9 +20,13 @@ function fmt(iso) {
   }
 }
 
+const PAGE_SIZE = 200;
+
 export default function AlertHistory() {
   const [rows, setRows] = useState([]);
   const [loading, setLoading] = useState(false);
+  const [hasMore, setHasMore] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [customers, setCustomers] = useState([]);
 
   const [filters, setFilters] = useState({
@@ -36,8 +40,9 @@ export default function AlertHistory() {
   const load = useCallback(async () => {
     setLoading(true);
     try {
-      const data = await api.getAlertHistory(filters);
-      setRows(data || []);
+      const data = (await api.getAlertHistory({ ...filters, limit: PAGE_SIZE })) || [];
+      setRows(data);
+      setHasMore(data.length === PAGE_SIZE);
     } catch (e) {
       console.error(e);
     } finally {
@@ -45,6 +50,23 @@ export default function AlertHistory() {
     }
   }, [filters]);
 
+  // 키셋 페이지네이션: 마지막 행의 id 이전 것부터
+  const loadMore = async () => {
+    if (!rows.length) return;
+    setLoadingMore(true);
+    try {
+      const data = (await api.getAlertHistory({
+        ...filters, limit: PAGE_SIZE, before_id: rows[rows.length - 1].id,
+      })) || [];
+      setRows((prev) => [...prev, ...data]);
+      setHasMore(data.length === PAGE_SIZE);
+    } catch (e) {
+      console.error(e);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     load();
     api.getVmCustomers().then(setCustomers).catch(() => {});
@@ -194,6 +216,17 @@ export default function AlertHistory() {
             </tbody>
           </table>
         )}
+        {!loading && hasMore && (
+          <div className="p-3 text-center border-t">
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="px-4 py-1.5 bg-gray-100 text-gray-600 text-sm rounded hover:bg-gray-200 disabled:opacity-50"
+            >
+              {loadingMore ? '불러오는 중...' : '더 보기'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
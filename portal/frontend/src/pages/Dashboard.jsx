@@ -1,4 +1,4 @@
-import React, { useEffect, useState, useCallback } from 'react';
+import React, { useEffect, useState, useCallback, useRef } from 'react';
 import { api } from '../api.js';
 import StatusDot from '../components/StatusDot.jsx';
 import AlertBadge from '../components/AlertBadge.jsx';
@@ -22,10 +22,16 @@ function groupByCustomer(servers) {
   return Object.values(groups);
 }
 
+const POLL_MS = 30000;
+const RECONNECT_MIN_MS = 1000;
+const RECONNECT_MAX_MS = 30000;
+
 export default function Dashboard() {
   const [servers, setServers] = useState([]);
   const [alerts, setAlerts] = useState([]);
   const [loading, setLoading] = useState(true);
+  const serversRef = useRef(servers);
+  serversRef.current = servers;
 
   const load = useCallback(async () => {
     try {
@@ -40,9 +46,82 @@ export default function Dashboard() {
   }, []);
 
   useEffect(() => {
-    load();
-    const interval = setInterval(load, 30000);
-    return () => clearInterval(interval);
+    // 연결(재연결) 시 전체 조회 후 변경분만 SSE로 반영.
+    // 스트림이 닫혀 있는 동안은 30초 주기 조회로 대체하고 백오프로 재연결
+    let es = null;
+    let closed = false;
+    let retry = null;
+    let poll = null;
+    let delay = RECONNECT_MIN_MS;
+
+    const stopPolling = () => {
+      clearInterval(poll);
+      poll = null;
+    };
+
+    const reconnect = () => {
+      load();
+      if (!poll) poll = setInterval(load, POLL_MS);
+      retry = setTimeout(connect, delay);
+      delay = Math.min(delay * 2, RECONNECT_MAX_MS);
+    };
+
+    const connect = async () => {
+      // 재연결마다 새 티켓 발급 (티켓은 수명이 짧음)
+      try {
+        es = await api.streamFleet();
+      } catch (e) {
+        console.error(e);
+        if (!closed) reconnect();
+        return;
+      }
+      if (closed) {
+        es.close();
+        return;
+      }
+      es.onopen = () => {
+        delay = RECONNECT_MIN_MS;
+        stopPolling();
+        load();
+      };
+      es.onerror = () => {
+        // CONNECTING이면 브라우저가 스스로 재연결 중 — 닫혔을 때만 직접 처리 (401 → 로그인 이동)
+        if (es.readyState !== EventSource.CLOSED) return;
+        reconnect();
+      };
+      es.addEventListener('resync', load);
+      es.addEventListener('server', (e) => {
+        const s = JSON.parse(e.data);
+        const same = (p) => p.customer_id === s.customer_id && p.server_name === s.server_name;
+        if (!serversRef.current.some(same)) {
+          // 신규 서버는 별칭/비활성 정보가 필요하므로 전체 재조회
+          load();
+          return;
+        }
+        setServers((prev) => prev.map((p) => (same(p) ? { ...p, online: s.online, last_seen: s.last_seen } : p)));
+      });
+      es.addEventListener('server_removed', (e) => {
+        const s = JSON.parse(e.data);
+        setServers((prev) => prev.filter((p) => !(p.customer_id === s.customer_id && p.server_name === s.server_name)));
+      });
+      es.addEventListener('alert', (e) => {
+        const a = JSON.parse(e.data);
+        setAlerts((prev) => {
+          if (a.action === 'resolved') return prev.filter((p) => p.fingerprint !== a.fingerprint);
+          if (prev.some((p) => p.fingerprint === a.fingerprint)) return prev;
+          const { action, ...alert } = a;
+          return [...prev, alert];
+        });
+      });
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      stopPolling();
+      if (es) es.close();
+    };
   }, [load]);
 
   const customers = groupByCustomer(servers);
@@ -157,7 +236,7 @@ export default function Dashboard() {
               </thead>
               <tbody className="divide-y divide-gray-100">
                 {alerts.map((a, i) => (
-                  <tr key={i} className="hover:bg-gray-50">
+                  <tr key={a.fingerprint || i} className="hover:bg-gray-50">
                     <td className="px-4 py-3">{a.customer_id}</td>
                     <td className="px-4 py-3">{a.server_name}</td>
                     <td className="px-4 py-3 font-medium">{a.alert_name}</td>
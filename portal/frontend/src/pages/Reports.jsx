@@ -15,6 +15,7 @@ export default function Reports() {
   const [customers, setCustomers] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
+  const [bulkJob, setBulkJob] = useState(null);
 
   useEffect(() => {
     api.getVmCustomers()
@@ -56,6 +57,27 @@ export default function Reports() {
     }
   };
 
+  const handleBulk = async () => {
+    if (!fromDate || !toDate) return;
+    if (fromDate > toDate) { setError('시작일이 종료일보다 늦을 수 없습니다.'); return; }
+    setError('');
+    try {
+      let job = await api.startBulkReport(fromDate, toDate);
+      setBulkJob(job);
+      while (job.status === 'running') {
+        await new Promise((r) => setTimeout(r, 2000));
+        job = await api.getBulkReport(job.job_id);
+        setBulkJob(job);
+      }
+      if (job.status !== 'done') throw new Error(job.error || '일괄 생성 실패');
+      await api.downloadBulkReport(job.job_id, `reports_${fromDate}_${toDate}.zip`);
+    } catch (e) {
+      setError(e.message);
+    }
+  };
+
+  const bulkRunning = bulkJob && bulkJob.status === 'running';
+
   return (
     <div className="p-6">
       <div className="mb-6">
@@ -128,6 +150,21 @@ export default function Reports() {
           >
             {loading ? '생성 중... (최대 60초)' : '📥 Excel 다운로드'}
           </button>
+
+          <button
+            onClick={handleBulk}
+            disabled={bulkRunning || !fromDate || !toDate}
+            className="w-full py-2.5 bg-white border border-blue-600 text-blue-600 rounded-lg text-sm font-medium hover:bg-blue-50 disabled:opacity-50 disabled:cursor-not-allowed"
+          >
+            {bulkRunning
+              ? `전체 고객사 생성 중... (${bulkJob.rendered}/${bulkJob.total})`
+              : '🗂️ 전체 고객사 일괄 다운로드 (ZIP)'}
+          </button>
+          {bulkJob && Object.keys(bulkJob.failed || {}).length > 0 && (
+            <div className="text-xs text-orange-600">
+              실패: {Object.keys(bulkJob.failed).join(', ')}
+            </div>
+          )}
         </div>
 
         <div className="mt-6 border-t pt-4">
@@ -140,6 +140,8 @@ export default function System() {
         <div className="font-semibold text-gray-700 mb-3">TLS 인증서</div>
         {cert?.error ? (
           <div className="text-red-600 text-sm">{cert.error}</div>
+        ) : cert?.pending ? (
+          <div className="text-gray-400 text-sm">{cert.hostname} 확인 중...</div>
         ) : (
           <div className="flex items-center gap-4">
             <div>
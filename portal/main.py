@@ -1,13 +1,28 @@
+import hashlib
+import hmac
 import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-from sqlalchemy import text
 
-from database import engine, SessionLocal, Base
-from models import PortalUser
-from auth import hash_password
+from database import engine, SessionLocal, Base, close_db
+from models import PortalUser, PortalMeta
+from auth import SECRET_KEY, hash_password, verify_password, pwd_context, close_auth
+import migrations
+from services import upstream
+from services import metrics
+from services import timing
+from services import profiler
+from services import fleet_cache
+from services import cert_probe
+from services import scheduler
+from services import report_data
+from services import bulk_export
+from services import alert_ingest
+from services import retention
+from services import alertmanager as am_svc
+from services import vmalert as vm_svc
 from routers import auth as auth_router
 from routers import servers as servers_router
 from routers import alerts as alerts_router
@@ -16,47 +31,55 @@ from routers import system as system_router
 from routers import users as users_router
 from routers import grafana as grafana_router
 from routers import reports as reports_router
+from routers import stream as stream_router
+from routers import analytics as analytics_router
 
 
-def _migrate(db):
-    """기존 테이블에 신규 컬럼 추가 (없을 때만)"""
-    migrations = [
-        "ALTER TABLE alert_thresholds ADD COLUMN retention_days INTEGER DEFAULT 1095",
-        "ALTER TABLE alert_history ADD COLUMN fingerprint TEXT",
-    ]
-    for sql in migrations:
-        try:
-            db.execute(text(sql))
-            db.commit()
-        except Exception:
-            db.rollback()
+def _password_fingerprint(username: str, password: str, password_hash: str) -> str:
+    # JWT 시크릿을 키로 쓰므로 DB만으로는 비밀번호를 추측할 수 없음
+    msg = "\0".join((username, password, password_hash)).encode()
+    return hmac.new(SECRET_KEY.encode(), msg, hashlib.sha256).hexdigest()
+
+
+def _sync_init_user(db):
+    """Create the initial admin, or re-sync its password from the env var when it changed.
+
+    bcrypt only runs when the env password differs from the one last synced
+    (tracked as an HMAC fingerprint in portal_meta), so an ordinary restart skips it.
+    """
+    init_user = os.getenv("PORTAL_INIT_USER", "admin")
+    init_pass = os.getenv("PORTAL_INIT_PASSWORD", "changeme123")
+
+    existing = db.query(PortalUser).filter(PortalUser.username == init_user).first()
+    if not existing:
+        existing = PortalUser(
+            username=init_user,
+            password_hash=hash_password(init_pass),
+            role="admin",
+        )
+        db.add(existing)
+        print(f"[portal] Created initial user: {init_user}")
+    else:
+        meta = db.get(PortalMeta, "init_password_fingerprint")
+        if meta and hmac.compare_digest(meta.value, _password_fingerprint(init_user, init_pass, existing.password_hash)):
+            return
+        if not verify_password(init_pass, existing.password_hash) or pwd_context.needs_update(existing.password_hash):
+            existing.password_hash = hash_password(init_pass)
+            print(f"[portal] Synced password for user: {init_user}")
+    db.merge(PortalMeta(
+        key="init_password_fingerprint",
+        value=_password_fingerprint(init_user, init_pass, existing.password_hash),
+    ))
+    db.commit()
 
 
 def init_db():
     Base.metadata.create_all(bind=engine)
 
     db = SessionLocal()
-    _migrate(db)
     try:
-        # Create initial admin user if not exists
-        init_user = os.getenv("PORTAL_INIT_USER", "admin")
-        init_pass = os.getenv("PORTAL_INIT_PASSWORD", "changeme123")
-
-        existing = db.query(PortalUser).filter(PortalUser.username == init_user).first()
-        if not existing:
-            user = PortalUser(
-                username=init_user,
-                password_hash=hash_password(init_pass),
-                role="admin",
-            )
-            db.add(user)
-            db.commit()
-            print(f"[portal] Created initial user: {init_user}")
-        else:
-            # Always sync password from env var on startup
-            existing.password_hash = hash_password(init_pass)
-            db.commit()
-            print(f"[portal] Synced password for user: {init_user}")
+        migrations.run(db)
+        _sync_init_user(db)
     finally:
         db.close()
 
@@ -64,10 +87,32 @@ def init_db():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    await upstream.init_clients()
+    alert_ingest.start()
+    fleet_cache.start()
+    cert_probe.start()
+    vm_svc.start()
+    scheduler.daily("report-rollup", report_data.ROLLUP_AT, report_data.nightly_rollup)
+    scheduler.daily("alert-retention", retention.RUN_AT, retention.run)
+    scheduler.start()
     yield
+    await scheduler.stop()
+    await bulk_export.shutdown()
+    await cert_probe.stop()
+    await fleet_cache.stop()
+    await alert_ingest.stop()
+    await am_svc.applier.stop()
+    await vm_svc.stop()
+    await upstream.close_clients()
+    close_auth()
+    close_db()
 
 
 app = FastAPI(title="MSP Monitoring Portal", lifespan=lifespan)
+app.add_middleware(metrics.MetricsMiddleware, router_app=app)
+app.add_middleware(timing.TimingMiddleware)
+app.add_middleware(profiler.ProfileMiddleware)
+app.add_route("/metrics", metrics.metrics_endpoint, include_in_schema=False)
 
 # API routers
 app.include_router(auth_router.router, prefix="/api")
@@ -78,6 +123,8 @@ app.include_router(system_router.router, prefix="/api")
 app.include_router(users_router.router, prefix="/api")
 app.include_router(grafana_router.router, prefix="/api")
 app.include_router(reports_router.router, prefix="/api")
+app.include_router(stream_router.router, prefix="/api")
+app.include_router(analytics_router.router, prefix="/api")
 
 # Frontend static files
 FRONTEND_DIST = os.path.join(os.path.dirname(__file__), "frontend", "dist")
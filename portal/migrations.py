@@ -0,0 +1,99 @@
+"""Versioned schema migrations.
+
+create_all() creates missing tables with their current columns but never
+alters an existing table. Each step below runs once, in order, and is recorded
+in schema_version. A start with every step applied costs a single SELECT.
+
+A step must be a no-op on a database that already has its change. Fresh
+databases get the columns from create_all. Databases from before
+schema_version got them from the old loop that tried every ALTER on each start.
+"""
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import engine
+from models import AlertHistory, SchemaVersion
+from services import alert_rollup
+
+
+def _has_column(db: Session, table: str, column: str) -> bool:
+    return any(row[1] == column for row in db.execute(text(f"PRAGMA table_info({table})")))
+
+
+def _add_column(db: Session, table: str, column: str, ddl: str) -> bool:
+    """ALTER TABLE … ADD COLUMN unless it exists. Returns True if it was added."""
+    if _has_column(db, table, column):
+        return False
+    db.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    return True
+
+
+def _v1_threshold_retention(db: Session):
+    _add_column(db, "alert_thresholds", "retention_days", "INTEGER DEFAULT 1095")
+
+
+def _v2_history_fingerprint(db: Session):
+    _add_column(db, "alert_history", "fingerprint", "TEXT")
+
+
+def _v3_history_epoch(db: Session):
+    _add_column(db, "alert_history", "started_ts", "INTEGER")
+    _add_column(db, "alert_history", "resolved_ts", "INTEGER")
+    # ISO 문자열 → epoch 초 (이미 채워진 행은 건너뜀)
+    db.execute(text(
+        "UPDATE alert_history SET started_ts = CAST(strftime('%s', started_at) AS INTEGER) "
+        "WHERE started_ts IS NULL AND started_at > '0001-12-31'"
+    ))
+    db.execute(text(
+        "UPDATE alert_history SET resolved_ts = CAST(strftime('%s', resolved_at) AS INTEGER) "
+        "WHERE resolved_ts IS NULL AND resolved_at > '0001-12-31'"
+    ))
+
+
+def _v4_history_indexes(db: Session):
+    db.commit()  # 인덱스는 별도 연결로 생성
+    for index in AlertHistory.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+
+def _v5_alert_rollup(db: Session):
+    # 이전 버전의 요약은 보존기간 정리 시 삭제된(=해소된) 행만 담고 있음
+    added = _add_column(db, "alert_daily_summary", "resolved_count", "INTEGER")
+    if added:
+        db.execute(text("UPDATE alert_daily_summary SET resolved_count = count"))
+    if added or alert_rollup.needs_backfill(db):
+        written = alert_rollup.rebuild(db)
+        print(f"[portal] Rebuilt alert_daily_summary from history ({written} rows)")
+
+
+# (version, name, step) — 추가만 하고 기존 항목은 바꾸지 않음
+MIGRATIONS = [
+    (1, "alert_thresholds.retention_days", _v1_threshold_retention),
+    (2, "alert_history.fingerprint", _v2_history_fingerprint),
+    (3, "alert_history started_ts/resolved_ts", _v3_history_epoch),
+    (4, "alert_history indexes", _v4_history_indexes),
+    (5, "alert_daily_summary resolved_count + backfill", _v5_alert_rollup),
+]
+
+
+def run(db: Session) -> int:
+    """Apply pending migrations. Returns how many ran."""
+    applied = {v for (v,) in db.query(SchemaVersion.version)}
+    ran = 0
+    for version, name, step in MIGRATIONS:
+        if version in applied:
+            continue
+        t0 = time.monotonic()
+        try:
+            step(db)
+            db.add(SchemaVersion(version=version, name=name))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        ran += 1
+        print(f"[portal] Migration {version} ({name}) applied in {time.monotonic() - t0:.2f}s")
+    return ran
+
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, UniqueConstraint
+from sqlalchemy import Column, Integer, Float, Text, Index, UniqueConstraint
 from database import Base
 from datetime import datetime, timezone
 
@@ -75,4 +75,74 @@ class AlertHistory(Base):
     message = Column(Text)
     started_at = Column(Text)
     resolved_at = Column(Text)
+    started_ts = Column(Integer)  # started_at/resolved_at의 epoch 초 (범위 조회용)
+    resolved_ts = Column(Integer)
     received_at = Column(Text, default=_now)
+
+    __table_args__ = (
+        # 웹훅의 "열린 알림" 조회 (fingerprint IN (...) AND resolved_at IS NULL)
+        Index("ix_alert_history_fp_resolved", "fingerprint", "resolved_at"),
+        # 이력 조회: 필터 조합 + id DESC 키셋 페이지네이션
+        Index("ix_alert_history_customer", "customer_id", "id"),
+        Index("ix_alert_history_customer_server", "customer_id", "server_name", "id"),
+        Index("ix_alert_history_customer_status", "customer_id", "status", "id"),
+        Index("ix_alert_history_status", "status", "id"),
+        Index("ix_alert_history_customer_started", "customer_id", "started_ts"),
+        Index("ix_alert_history_started", "started_ts"),
+        Index("ix_alert_history_resolved", "resolved_ts"),
+    )
+
+
+class DailyStat(Base):
+    """서버별 일간 avg/max (마감된 날짜만, 리포트용 롤업)"""
+    __tablename__ = "daily_stats"
+
+    customer_id = Column(Text, primary_key=True)
+    date = Column(Text, primary_key=True)  # YYYY-MM-DD (KST)
+    server_name = Column(Text, primary_key=True)
+    metric = Column(Text, primary_key=True)  # cpu, mem, disk, net_in, net_out, disk_read, disk_write
+    avg = Column(Float)
+    max = Column(Float)
+
+
+class DailyRollup(Base):
+    """daily_stats에 집계가 끝난 (고객사, 날짜) — 데이터가 없는 날도 기록"""
+    __tablename__ = "daily_rollups"
+
+    customer_id = Column(Text, primary_key=True)
+    date = Column(Text, primary_key=True)
+    computed_at = Column(Text, default=_now)
+
+
+class AlertDailySummary(Base):
+    """alert_history 일별 요약 — 웹훅 처리 시 증분 갱신, 보존기간 정리 후에도 남음 (services.alert_rollup)"""
+    __tablename__ = "alert_daily_summary"
+
+    customer_id = Column(Text, primary_key=True)
+    date = Column(Text, primary_key=True)  # YYYY-MM-DD (KST, started_at 기준)
+    server_name = Column(Text, primary_key=True)
+    alert_name = Column(Text, primary_key=True)
+    severity = Column(Text, primary_key=True)
+    count = Column(Integer, default=0)  # 발생 건수
+    resolved_count = Column(Integer, default=0)  # 그중 해소된 건수
+    firing_seconds = Column(Integer, default=0)  # 해소된 알림의 발생~해소 시간 합 (MTTR = / resolved_count)
+
+    # 고객사를 지정하지 않은 기간 조회
+    __table_args__ = (Index("ix_alert_daily_summary_date", "date"),)
+
+
+class SchemaVersion(Base):
+    """적용된 마이그레이션 (migrations.py)"""
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True)
+    name = Column(Text)
+    applied_at = Column(Text, default=_now)
+
+
+class PortalMeta(Base):
+    """포털 내부 상태 key-value (예: 초기 관리자 비밀번호 동기화 지문)"""
+    __tablename__ = "portal_meta"
+
+    key = Column(Text, primary_key=True)
+    value = Column(Text)
@@ -1,19 +1,21 @@
-import os
-import httpx
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from typing import Optional
-from database import get_db
+from database import get_db, run_db
 from models import CustomerEmail, AlertThreshold, AlertHistory
 from schemas import AlertConfigUpdate, AlertConfigResponse, EmailEntry, ThresholdConfig, AddEmailRequest
 from auth import get_current_user, require_admin
 from services import alertmanager as am_svc
 from services import vmalert as vm_svc
+from services import fleet_cache
+from services import alert_ingest
+from services import retention
 
 router = APIRouter(prefix="/alerts", tags=["alerts"])
 
-AM_URL = os.getenv("ALERTMANAGER_URL", "http://alertmanager:9093")
+HISTORY_MAX_LIMIT = 1000
 
 
 def _get_config(customer_id: str, db: Session) -> AlertConfigResponse:
@@ -32,24 +34,6 @@ def _get_config(customer_id: str, db: Session) -> AlertConfigResponse:
     )
 
 
-def _build_customers_for_am(db: Session) -> list[dict]:
-    emails = db.query(CustomerEmail).filter(CustomerEmail.enabled == 1).all()
-    customers = {}
-    for e in emails:
-        if e.customer_id not in customers:
-            customers[e.customer_id] = []
-        customers[e.customer_id].append(e.email)
-    return [{"customer_id": cid, "emails": elist} for cid, elist in customers.items()]
-
-
-def _build_thresholds_for_vmalert(db: Session) -> list[dict]:
-    thresholds = db.query(AlertThreshold).all()
-    return [
-        {"customer_id": t.customer_id, "cpu": t.cpu, "memory": t.memory, "disk": t.disk}
-        for t in thresholds
-    ]
-
-
 @router.get("/customers")
 async def list_vm_customers(user: dict = Depends(get_current_user)):
     """VictoriaMetrics에서 실제 데이터가 있는 customer_id 목록 반환"""
@@ -74,6 +58,25 @@ def get_config(customer_id: str, db: Session = Depends(get_db), user: dict = Dep
     return _get_config(customer_id, db)
 
 
+def _save_thresholds(db: Session, customer_id: str, thresholds: ThresholdConfig):
+    t = db.query(AlertThreshold).filter(AlertThreshold.customer_id == customer_id).first()
+    if t:
+        t.cpu = thresholds.cpu
+        t.memory = thresholds.memory
+        t.disk = thresholds.disk
+        t.retention_days = thresholds.retention_days
+    else:
+        t = AlertThreshold(
+            customer_id=customer_id,
+            cpu=thresholds.cpu,
+            memory=thresholds.memory,
+            disk=thresholds.disk,
+            retention_days=thresholds.retention_days,
+        )
+        db.add(t)
+    db.commit()
+
+
 @router.put("/config/{customer_id}", dependencies=[Depends(require_admin)])
 async def update_config(
     customer_id: str,
@@ -81,71 +84,48 @@ async def update_config(
     db: Session = Depends(get_db),
 ):
     if body.thresholds is not None:
-        t = db.query(AlertThreshold).filter(AlertThreshold.customer_id == customer_id).first()
-        if t:
-            t.cpu = body.thresholds.cpu
-            t.memory = body.thresholds.memory
-            t.disk = body.thresholds.disk
-            t.retention_days = body.thresholds.retention_days
-        else:
-            t = AlertThreshold(
-                customer_id=customer_id,
-                cpu=body.thresholds.cpu,
-                memory=body.thresholds.memory,
-                disk=body.thresholds.disk,
-                retention_days=body.thresholds.retention_days,
-            )
-            db.add(t)
-
-    db.commit()
-
-    # Apply configs
-    am_customers = _build_customers_for_am(db)
-    vm_thresholds = _build_thresholds_for_vmalert(db)
-
-    am_ok = await am_svc.apply_alertmanager_config(am_customers)
-    vm_ok = await vm_svc.apply_vmalert_rules(vm_thresholds)
+        await run_db(_save_thresholds, db, customer_id, body.thresholds)
 
+    # Apply configs (읽기는 apply 시점에 DB에서)
     return {
         "message": "Config updated",
-        "restarted": {
-            "alertmanager": am_ok,
-            "vmalert": vm_ok,
+        "apply": {
+            "alertmanager": am_svc.request_apply()["state"],
+            "vmalert": vm_svc.request_apply()["state"],
         }
     }
 
 
-@router.post("/config/{customer_id}/emails", dependencies=[Depends(require_admin)])
-async def add_email(
-    customer_id: str,
-    body: AddEmailRequest,
-    db: Session = Depends(get_db),
-):
+def _add_email(db: Session, customer_id: str, address: str) -> EmailEntry:
     existing = db.query(CustomerEmail).filter(
         CustomerEmail.customer_id == customer_id,
-        CustomerEmail.email == body.email,
+        CustomerEmail.email == address,
     ).first()
     if existing:
         raise HTTPException(status_code=409, detail="Email already exists")
 
-    email = CustomerEmail(customer_id=customer_id, email=body.email, enabled=1)
+    email = CustomerEmail(customer_id=customer_id, email=address, enabled=1)
     db.add(email)
     db.commit()
     db.refresh(email)
-
-    # Re-apply alertmanager config
-    am_customers = _build_customers_for_am(db)
-    await am_svc.apply_alertmanager_config(am_customers)
-
     return EmailEntry(id=email.id, email=email.email, enabled=True)
 
 
-@router.delete("/config/{customer_id}/emails/{email_id}", dependencies=[Depends(require_admin)])
-async def delete_email(
+@router.post("/config/{customer_id}/emails", dependencies=[Depends(require_admin)])
+async def add_email(
     customer_id: str,
-    email_id: int,
+    body: AddEmailRequest,
     db: Session = Depends(get_db),
 ):
+    entry = await run_db(_add_email, db, customer_id, body.email)
+
+    # Re-apply alertmanager config
+    am_svc.request_apply()
+
+    return entry
+
+
+def _delete_email(db: Session, customer_id: str, email_id: int):
     email = db.query(CustomerEmail).filter(
         CustomerEmail.id == email_id,
         CustomerEmail.customer_id == customer_id,
@@ -156,39 +136,43 @@ async def delete_email(
     db.delete(email)
     db.commit()
 
-    am_customers = _build_customers_for_am(db)
-    await am_svc.apply_alertmanager_config(am_customers)
 
-    return {"message": "Email deleted"}
-
-
-@router.delete("/config/{customer_id}", dependencies=[Depends(require_admin)])
-async def delete_customer_config(
+@router.delete("/config/{customer_id}/emails/{email_id}", dependencies=[Depends(require_admin)])
+async def delete_email(
     customer_id: str,
+    email_id: int,
     db: Session = Depends(get_db),
 ):
+    await run_db(_delete_email, db, customer_id, email_id)
+
+    am_svc.request_apply()
+
+    return {"message": "Email deleted"}
+
+
+def _delete_customer_config(db: Session, customer_id: str):
     db.query(CustomerEmail).filter(CustomerEmail.customer_id == customer_id).delete()
     db.query(AlertThreshold).filter(AlertThreshold.customer_id == customer_id).delete()
     db.commit()
 
-    am_customers = _build_customers_for_am(db)
-    vm_thresholds = _build_thresholds_for_vmalert(db)
 
-    am_ok = await am_svc.apply_alertmanager_config(am_customers)
-    vm_ok = await vm_svc.apply_vmalert_rules(vm_thresholds)
+@router.delete("/config/{customer_id}", dependencies=[Depends(require_admin)])
+async def delete_customer_config(
+    customer_id: str,
+    db: Session = Depends(get_db),
+):
+    await run_db(_delete_customer_config, db, customer_id)
 
     return {
         "message": "Customer config deleted",
-        "restarted": {"alertmanager": am_ok, "vmalert": vm_ok},
+        "apply": {
+            "alertmanager": am_svc.request_apply()["state"],
+            "vmalert": vm_svc.request_apply()["state"],
+        },
     }
 
 
-@router.patch("/config/{customer_id}/emails/{email_id}", dependencies=[Depends(require_admin)])
-async def toggle_email(
-    customer_id: str,
-    email_id: int,
-    db: Session = Depends(get_db),
-):
+def _toggle_email(db: Session, customer_id: str, email_id: int) -> EmailEntry:
     email = db.query(CustomerEmail).filter(
         CustomerEmail.id == email_id,
         CustomerEmail.customer_id == customer_id,
@@ -198,87 +182,92 @@ async def toggle_email(
 
     email.enabled = 0 if email.enabled else 1
     db.commit()
+    return EmailEntry(id=email.id, email=email.email, enabled=bool(email.enabled))
 
-    am_customers = _build_customers_for_am(db)
-    await am_svc.apply_alertmanager_config(am_customers)
 
-    return EmailEntry(id=email.id, email=email.email, enabled=bool(email.enabled))
+@router.patch("/config/{customer_id}/emails/{email_id}", dependencies=[Depends(require_admin)])
+async def toggle_email(
+    customer_id: str,
+    email_id: int,
+    db: Session = Depends(get_db),
+):
+    entry = await run_db(_toggle_email, db, customer_id, email_id)
+
+    am_svc.request_apply()
+
+    return entry
+
+
+@router.get("/apply-status")
+def get_apply_status(user: dict = Depends(get_current_user)):
+    """설정 변경은 모아서 반영됨 — Alertmanager/vmalert 반영 상태 조회"""
+    return {"alertmanager": am_svc.apply_status(), "vmalert": vm_svc.apply_status()}
 
 
 @router.get("/firing")
-async def get_firing_alerts(user: dict = Depends(get_current_user)):
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(f"{AM_URL}/api/v2/alerts?active=true&silenced=false")
-            resp.raise_for_status()
-            alerts = resp.json()
-            result = []
-            for a in alerts:
-                labels = a.get("labels", {})
-                result.append({
-                    "customer_id": labels.get("customer_id", ""),
-                    "server_name": labels.get("server_name", ""),
-                    "alert_name": labels.get("alertname", ""),
-                    "severity": labels.get("severity", ""),
-                    "starts_at": a.get("startsAt", ""),
-                    "status": a.get("status", {}).get("state", ""),
-                })
-            return result
-    except Exception as e:
-        return []
+async def get_firing_alerts(response: Response, user: dict = Depends(get_current_user)):
+    snapshot = await fleet_cache.get(fleet_cache.alerts)
+    if snapshot.data is None:
+        raise HTTPException(status_code=503, detail=snapshot.error)
+    response.headers.update(fleet_cache.headers(snapshot))
+    return snapshot.data
 
 
 @router.post("/webhook")
-async def alert_webhook(payload: dict, db: Session = Depends(get_db)):
-    """alertmanager webhook 수신 → alert_history 저장"""
-    for alert in payload.get("alerts", []):
-        labels = alert.get("labels", {})
-        annotations = alert.get("annotations", {})
-        fingerprint = alert.get("fingerprint", "")
-        status = alert.get("status", "firing")
-        starts_at = alert.get("startsAt", "")
-        ends_at = alert.get("endsAt", "")
-
-        if status == "firing":
-            existing = db.query(AlertHistory).filter(
-                AlertHistory.fingerprint == fingerprint,
-                AlertHistory.resolved_at == None,
-            ).first()
-            if not existing:
-                db.add(AlertHistory(
-                    fingerprint=fingerprint,
-                    customer_id=labels.get("customer_id", ""),
-                    server_name=labels.get("server_name", ""),
-                    alert_name=labels.get("alertname", ""),
-                    status="firing",
-                    severity=labels.get("severity", ""),
-                    message=annotations.get("description", ""),
-                    started_at=starts_at,
-                ))
-        elif status == "resolved":
-            existing = db.query(AlertHistory).filter(
-                AlertHistory.fingerprint == fingerprint,
-                AlertHistory.resolved_at == None,
-            ).first()
-            if existing:
-                existing.status = "resolved"
-                existing.resolved_at = ends_at if not ends_at.startswith("0001") else None
-
-    db.commit()
+async def alert_webhook(payload: dict):
+    """alertmanager webhook 수신 → 큐에 넣고 즉시 응답 (alert_history 저장은 writer가 일괄 처리)"""
+    alerts = payload.get("alerts", [])
+    if not isinstance(alerts, list) or not all(isinstance(a, dict) for a in alerts):
+        raise HTTPException(status_code=422, detail="alerts must be a list of objects")
+    fleet_cache.apply_webhook_alerts(alerts)
+    alert_ingest.enqueue(alerts)
     return {"ok": True}
 
 
+@router.get("/webhook/stats")
+def webhook_stats(user: dict = Depends(get_current_user)):
+    return alert_ingest.stats()
+
+
+@router.get("/retention")
+def retention_status(user: dict = Depends(get_current_user)):
+    """보존기간 정리 작업의 마지막 실행 결과 (삭제 건수, 소요 시간)"""
+    return {
+        "running": retention.running(),
+        "auto_vacuum": retention.auto_vacuum_mode(),
+        "last_run": retention.last_run(),
+    }
+
+
+@router.post("/retention/run", status_code=202, dependencies=[Depends(require_admin)])
+async def run_retention():
+    if not retention.start_now():
+        raise HTTPException(status_code=409, detail="Retention compaction already running")
+    return {"message": "Retention compaction started"}
+
+
+def _day_start_ts(value: str, param: str) -> int:
+    try:
+        d = datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{param} must be YYYY-MM-DD")
+    return int(d.replace(tzinfo=timezone.utc).timestamp())
+
+
 @router.get("/history")
 def get_alert_history(
+    response: Response,
     customer_id: Optional[str] = None,
     server_name: Optional[str] = None,
     status: Optional[str] = None,
     from_date: Optional[str] = None,
     to_date: Optional[str] = None,
-    limit: int = 200,
+    before_id: Optional[int] = None,
+    limit: int = Query(200, ge=1, le=HISTORY_MAX_LIMIT),
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user),
 ):
+    """id 내림차순 키셋 페이지네이션: 다음 페이지는 before_id=<X-Next-Cursor>"""
     q = db.query(AlertHistory)
     if customer_id:
         q = q.filter(AlertHistory.customer_id == customer_id)
@@ -287,7 +276,12 @@ def get_alert_history(
     if status:
         q = q.filter(AlertHistory.status == status)
     if from_date:
-        q = q.filter(AlertHistory.started_at >= from_date)
+        q = q.filter(AlertHistory.started_ts >= _day_start_ts(from_date, "from_date"))
     if to_date:
-        q = q.filter(AlertHistory.started_at <= to_date + "T23:59:59Z")
-    return q.order_by(AlertHistory.id.desc()).limit(limit).all()
+        q = q.filter(AlertHistory.started_ts < _day_start_ts(to_date, "to_date") + 86400)
+    if before_id is not None:
+        q = q.filter(AlertHistory.id < before_id)
+    rows = q.order_by(AlertHistory.id.desc()).limit(limit).all()
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = str(rows[-1].id)
+    return rows
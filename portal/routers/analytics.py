@@ -0,0 +1,88 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from auth import get_current_user
+from database import get_db
+from models import AlertDailySummary as S
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+TZ_KST = timezone(timedelta(hours=9))
+DEFAULT_DAYS = 30
+MAX_DAYS = 3 * 366
+
+
+def _parse(value: Optional[str], param: str, default: date) -> date:
+    if not value:
+        return default
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{param} must be YYYY-MM-DD")
+
+
+def _metrics(count, resolved, seconds) -> dict:
+    return {
+        "count": count or 0,
+        "resolved": resolved or 0,
+        "mttr_seconds": round(seconds / resolved) if resolved else None,
+    }
+
+
+def _grouped(q, *columns, order_by_count: bool = True, limit: Optional[int] = None) -> list[dict]:
+    q = q.with_entities(
+        *columns, func.sum(S.count), func.sum(S.resolved_count), func.sum(S.firing_seconds),
+    ).group_by(*columns)
+    q = q.order_by(func.sum(S.count).desc()) if order_by_count else q.order_by(*columns)
+    if limit:
+        q = q.limit(limit)
+    n = len(columns)
+    return [
+        {**{c.key: v for c, v in zip(columns, row[:n])}, **_metrics(*row[n:])}
+        for row in q
+    ]
+
+
+@router.get("/alerts")
+def alert_analytics(
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    customer_id: Optional[str] = None,
+    interval: Literal["day", "week"] = "day",
+    top: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_current_user),
+):
+    """알림 건수/MTTR 집계 (alert_daily_summary 기반, 날짜는 KST 발생일 기준)"""
+    today = datetime.now(TZ_KST).date()
+    last = _parse(to_date, "to_date", today)
+    first = _parse(from_date, "from_date", last - timedelta(days=DEFAULT_DAYS - 1))
+    if first > last:
+        raise HTTPException(status_code=400, detail="from_date must be <= to_date")
+    if (last - first).days + 1 > MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Maximum range is {MAX_DAYS} days")
+
+    q = db.query(S).filter(S.date >= first.isoformat(), S.date <= last.isoformat())
+    if customer_id:
+        q = q.filter(S.customer_id == customer_id)
+
+    # 주 단위는 월요일 시작
+    period = (S.date if interval == "day" else func.date(S.date, "weekday 0", "-6 days")).label("period")
+    totals = q.with_entities(
+        func.sum(S.count), func.sum(S.resolved_count), func.sum(S.firing_seconds),
+    ).one()
+
+    return {
+        "from_date": first.isoformat(),
+        "to_date": last.isoformat(),
+        "interval": interval,
+        "totals": _metrics(*totals),
+        "series": _grouped(q, period, order_by_count=False),
+        "by_customer": _grouped(q, S.customer_id),
+        "by_alert": _grouped(q, S.alert_name),
+        "top_servers": _grouped(q, S.customer_id, S.server_name, limit=top),
+    }
@@ -1,26 +1,46 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 
-from database import get_db
+from database import SessionLocal, run_db
 from models import PortalUser
 from schemas import LoginRequest, TokenResponse
-from auth import verify_password, create_access_token, get_current_user
+from auth import verify_password_async, create_access_token, get_current_user
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def _get_user(username: str):
+    db = SessionLocal()
+    try:
+        user = db.query(PortalUser).filter(PortalUser.username == username).first()
+        return (user.id, user.password_hash, user.username, user.role) if user else None
+    finally:
+        db.close()
+
+
+def _touch_last_login(user_id: int):
+    db = SessionLocal()
+    try:
+        db.query(PortalUser).filter(PortalUser.id == user_id).update(
+            {"last_login": datetime.now(timezone.utc).isoformat()}
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
 @router.post("/login", response_model=TokenResponse)
-def login(req: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(PortalUser).filter(PortalUser.username == req.username).first()
-    if not user or not verify_password(req.password, user.password_hash):
+async def login(req: LoginRequest):
+    # bcrypt는 auth 전용 스레드 풀에서 — 로그인 폭주가 다른 API 요청의 워커를 잡아먹지 않도록
+    user = await run_db(_get_user, req.username)
+    if not user or not await verify_password_async(req.password, user[1]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    user_id, _, username, role = user
 
-    user.last_login = datetime.now(timezone.utc).isoformat()
-    db.commit()
+    await run_db(_touch_last_login, user_id)
 
-    token = create_access_token({"sub": user.username, "role": user.role})
-    return TokenResponse(access_token=token, role=user.role)
+    token = create_access_token({"sub": username, "role": role})
+    return TokenResponse(access_token=token, role=role)
 
 
 @router.post("/logout")
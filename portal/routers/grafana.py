@@ -1,14 +1,13 @@
 import os
-import httpx
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Optional
 
 from auth import require_admin
+from services import upstream
 
 router = APIRouter(prefix="/grafana", tags=["grafana"])
 
-GRAFANA_URL = os.getenv("GRAFANA_URL", "http://grafana:3000")
 GRAFANA_ADMIN_USER = os.getenv("GRAFANA_ADMIN_USER", "admin")
 GRAFANA_ADMIN_PASSWORD = os.getenv("GRAFANA_ADMIN_PASSWORD", "changeme")
 
@@ -34,15 +33,15 @@ class GrafanaRoleUpdate(BaseModel):
 
 
 async def _request(method: str, path: str, **kwargs):
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        resp = await client.request(method, f"{GRAFANA_URL}{path}", auth=_auth(), **kwargs)
-        if resp.status_code >= 400:
-            try:
-                detail = resp.json().get("message", resp.text)
-            except Exception:
-                detail = resp.text
-            raise HTTPException(status_code=resp.status_code, detail=detail)
-        return resp.json() if resp.text else {}
+    client = upstream.get_client(upstream.GRAFANA)
+    resp = await client.request(method, path, auth=_auth(), **kwargs)
+    if resp.status_code >= 400:
+        try:
+            detail = resp.json().get("message", resp.text)
+        except Exception:
+            detail = resp.text
+        raise HTTPException(status_code=resp.status_code, detail=detail)
+    return resp.json() if resp.text else {}
 
 
 @router.get("/users", dependencies=[Depends(require_admin)])
@@ -1,27 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 
-from database import get_db
+from database import get_db, run_db
 from models import ServerAlias, InactiveServer
 from schemas import ServerAliasUpdate, ServerInfo
 from auth import get_current_user, require_admin
 from services import victoriametrics as vm
+from services import fleet_cache
 
 router = APIRouter(prefix="/servers", tags=["servers"])
 
 
-@router.get("", response_model=list[ServerInfo])
-async def list_servers(
-    include_inactive: bool = Query(False),
-    db: Session = Depends(get_db),
-    user: dict = Depends(get_current_user),
-):
-    try:
-        all_servers = await vm.get_all_series()
-    except Exception as e:
-        raise HTTPException(status_code=503, detail=str(e))
-
+def _load_overrides(db: Session) -> tuple[set, dict]:
     inactive_set = {
         (r.customer_id, r.server_name)
         for r in db.query(InactiveServer).all()
@@ -30,6 +21,23 @@ async def list_servers(
         (a.customer_id, a.server_name): a
         for a in db.query(ServerAlias).all()
     }
+    return inactive_set, aliases
+
+
+@router.get("", response_model=list[ServerInfo])
+async def list_servers(
+    response: Response,
+    include_inactive: bool = Query(False),
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_current_user),
+):
+    snapshot = await fleet_cache.get(fleet_cache.servers)
+    if snapshot.data is None:
+        raise HTTPException(status_code=503, detail=snapshot.error)
+    response.headers.update(fleet_cache.headers(snapshot))
+    all_servers = snapshot.data
+
+    inactive_set, aliases = await run_db(_load_overrides, db)
 
     result = []
     for s in all_servers:
@@ -40,8 +48,6 @@ async def list_servers(
             continue
 
         alias = aliases.get(key)
-        last_seen = await vm.get_server_last_seen(s["customer_id"], s["server_name"])
-        online = await vm.is_server_online(last_seen)
 
         result.append(ServerInfo(
             customer_id=s["customer_id"],
@@ -49,8 +55,8 @@ async def list_servers(
             display_customer=alias.display_customer if alias else None,
             display_server=alias.display_server if alias else None,
             notes=alias.notes if alias else None,
-            online=online,
-            last_seen=last_seen,
+            online=s["online"],
+            last_seen=s["last_seen"],
             inactive=is_inactive,
         ))
 
@@ -102,38 +108,43 @@ async def delete_server(
         success = await vm.delete_series(customer_id, server_name)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to delete metrics from VictoriaMetrics")
+        fleet_cache.discard_server(customer_id, server_name)
         # Also remove from inactive if present
-        db.query(InactiveServer).filter(
-            InactiveServer.customer_id == customer_id,
-            InactiveServer.server_name == server_name,
-        ).delete()
-        db.commit()
+        await run_db(_restore, db, customer_id, server_name)
         return {"message": "Server metrics purged from VictoriaMetrics"}
     else:
-        existing = db.query(InactiveServer).filter(
-            InactiveServer.customer_id == customer_id,
-            InactiveServer.server_name == server_name,
-        ).first()
-        if not existing:
-            inactive = InactiveServer(
-                customer_id=customer_id,
-                server_name=server_name,
-                deactivated_at=datetime.now(timezone.utc).isoformat(),
-            )
-            db.add(inactive)
-            db.commit()
+        await run_db(_deactivate, db, customer_id, server_name)
         return {"message": "Server deactivated (metrics retained)"}
 
 
+def _deactivate(db: Session, customer_id: str, server_name: str):
+    existing = db.query(InactiveServer).filter(
+        InactiveServer.customer_id == customer_id,
+        InactiveServer.server_name == server_name,
+    ).first()
+    if not existing:
+        inactive = InactiveServer(
+            customer_id=customer_id,
+            server_name=server_name,
+            deactivated_at=datetime.now(timezone.utc).isoformat(),
+        )
+        db.add(inactive)
+        db.commit()
+
+
+def _restore(db: Session, customer_id: str, server_name: str):
+    db.query(InactiveServer).filter(
+        InactiveServer.customer_id == customer_id,
+        InactiveServer.server_name == server_name,
+    ).delete()
+    db.commit()
+
+
 @router.post("/{customer_id}/{server_name}/restore", dependencies=[Depends(require_admin)])
 def restore_server(
     customer_id: str,
     server_name: str,
     db: Session = Depends(get_db),
 ):
-    db.query(InactiveServer).filter(
-        InactiveServer.customer_id == customer_id,
-        InactiveServer.server_name == server_name,
-    ).delete()
-    db.commit()
+    _restore(db, customer_id, server_name)
     return {"message": "Server restored"}
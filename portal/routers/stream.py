@@ -0,0 +1,38 @@
+import asyncio
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from auth import STREAM_TICKET_SECONDS, create_stream_ticket, get_current_user, get_stream_user
+from services import fleet_events
+
+router = APIRouter(prefix="/stream", tags=["stream"])
+
+KEEPALIVE_SECONDS = 15
+
+
+async def _event_stream():
+    with fleet_events.subscribe() as queue:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event, data = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield fleet_events.format_sse(event, data)
+
+
+@router.post("/ticket")
+async def stream_ticket(user: dict = Depends(get_current_user)):
+    """스트림 연결용 단기 티켓 발급 — 세션 토큰을 URL에 싣지 않기 위함"""
+    return {"ticket": create_stream_ticket(user), "expires_in": STREAM_TICKET_SECONDS}
+
+
+@router.get("/fleet")
+async def stream_fleet(user: dict = Depends(get_stream_user)):
+    """서버 온라인/오프라인 변화와 알람 발생/해소를 SSE로 푸시"""
+    return StreamingResponse(
+        _event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,17 +1,14 @@
-import os
-import ssl
-import socket
-from datetime import datetime, timezone
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException
-import httpx
+from fastapi.responses import FileResponse
 
 from auth import get_current_user, require_admin
+from services import cert_probe, profiler, upstream
 from services.docker_mgr import get_all_container_statuses, restart_container
 
 router = APIRouter(prefix="/system", tags=["system"])
 
-VM_URL = os.getenv("VICTORIAMETRICS_URL", "http://victoriametrics:8428")
-
 MANAGED_CONTAINERS = [
     "msp-victoriametrics",
     "msp-grafana",
@@ -30,35 +27,22 @@ RESTARTABLE = {
 }
 
 
-def _get_cert_expiry(hostname: str) -> dict:
+async def _get_storage() -> dict:
     try:
-        ctx = ssl.create_default_context()
-        with ctx.wrap_socket(socket.socket(), server_hostname=hostname) as s:
-            s.settimeout(5)
-            s.connect((hostname, 443))
-            cert = s.getpeercert()
-            expiry_str = cert["notAfter"]
-            expiry = datetime.strptime(expiry_str, "%b %d %H:%M:%S %Y %Z").replace(tzinfo=timezone.utc)
-            days_left = (expiry - datetime.now(timezone.utc)).days
-            return {"hostname": hostname, "expires_at": expiry.isoformat(), "days_left": days_left}
-    except Exception as e:
-        return {"hostname": hostname, "error": str(e)}
+        resp = await upstream.get_client(upstream.VICTORIAMETRICS).get("/api/v1/status/tsdb")
+        if resp.status_code == 200:
+            return resp.json().get("data", {})
+    except Exception:
+        pass
+    return {}
 
 
 @router.get("/status")
 async def get_status(user: dict = Depends(get_current_user)):
-    containers = await get_all_container_statuses(MANAGED_CONTAINERS)
-
-    storage = {}
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(f"{VM_URL}/api/v1/status/tsdb")
-            if resp.status_code == 200:
-                storage = resp.json().get("data", {})
-    except Exception:
-        pass
-
-    cert = _get_cert_expiry("grafana.tbit.co.kr")
+    containers, storage = await asyncio.gather(
+        get_all_container_statuses(MANAGED_CONTAINERS), _get_storage(),
+    )
+    cert = cert_probe.get()
 
     return {
         "containers": containers,
@@ -75,3 +59,17 @@ async def restart_service(service: str):
 
     ok = await restart_container(container_name)
     return {"service": service, "restarted": ok}
+
+
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+def list_profiles():
+    """요청 프로파일 목록 (X-Profile: 1 또는 ?profile=1로 생성, services.profiler)"""
+    return profiler.list_profiles()
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+def get_profile(profile_id: str):
+    path = profiler.profile_path(profile_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=profile_id)
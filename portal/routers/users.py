@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from database import get_db
 from models import PortalUser
 from schemas import UserCreate, UserUpdate, UserResponse
-from auth import hash_password, get_current_user, require_admin
+from auth import hash_password_pooled, get_current_user, require_admin
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -23,7 +23,7 @@ def create_user(body: UserCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=409, detail="Username already exists")
     user = PortalUser(
         username=body.username,
-        password_hash=hash_password(body.password),
+        password_hash=hash_password_pooled(body.password),
         role=body.role,
     )
     db.add(user)
@@ -42,7 +42,7 @@ def update_user(user_id: int, body: UserUpdate, db: Session = Depends(get_db)):
             raise HTTPException(status_code=400, detail="Role must be admin or viewer")
         user.role = body.role
     if body.password is not None:
-        user.password_hash = hash_password(body.password)
+        user.password_hash = hash_password_pooled(body.password)
     db.commit()
     db.refresh(user)
     return user
@@ -65,6 +65,6 @@ def change_my_password(body: UserUpdate, db: Session = Depends(get_db), current_
     if not body.password:
         raise HTTPException(status_code=400, detail="Password required")
     user = db.query(PortalUser).filter(PortalUser.username == current_user["sub"]).first()
-    user.password_hash = hash_password(body.password)
+    user.password_hash = hash_password_pooled(body.password)
     db.commit()
     return {"message": "Password changed"}
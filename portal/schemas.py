@@ -61,6 +61,14 @@ class AddEmailRequest(BaseModel):
     email: str
 
 
+# Reports
+class BulkReportRequest(BaseModel):
+    from_date: str
+    to_date: str
+    customer_ids: Optional[List[str]] = None  # None → VictoriaMetrics의 전체 고객사
+    mode: str = "daily"
+
+
 # Users
 class UserCreate(BaseModel):
     username: str
@@ -0,0 +1,100 @@
+"""Vectorized per-server, per-day statistics for VictoriaMetrics range results."""
+from datetime import datetime, timezone
+
+import numpy as np
+
+DAY = 86400
+KST_OFFSET = 9 * 3600
+
+
+def _load(results: list) -> tuple[list[str], np.ndarray, np.ndarray, np.ndarray]:
+    """Flatten a query_range result into (server names, server idx, ts, value) arrays."""
+    names: dict[str, int] = {}
+    idx_parts, ts_parts, val_parts = [], [], []
+    for r in results:
+        values = r.get("values")
+        if not values:
+            continue
+        server = r["metric"].get("server_name", "unknown")
+        idx = names.setdefault(server, len(names))
+        n = len(values)
+        ts_parts.append(np.fromiter((p[0] for p in values), np.float64, n))
+        try:
+            val_parts.append(np.fromiter(map(float, (p[1] for p in values)), np.float64, n))
+        except (ValueError, TypeError):
+            # 숫자가 아닌 값이 섞인 경우만 느린 경로
+            val_parts.append(np.fromiter(map(_to_float, (p[1] for p in values)), np.float64, n))
+        idx_parts.append(np.full(n, idx, dtype=np.int64))
+    if not ts_parts:
+        empty = np.empty(0)
+        return [], empty.astype(np.int64), empty, empty
+    return (
+        list(names),
+        np.concatenate(idx_parts),
+        np.concatenate(ts_parts),
+        np.concatenate(val_parts),
+    )
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def daily_stats(results: list, tz_offset: int = KST_OFFSET, percentile: float = 95.0) -> dict:
+    """Returns {server_name: {date: {"avg", "max", "min", "p95"}}}.
+
+    Samples are bucketed into local days with integer arithmetic; negative and
+    non-finite values are dropped. All servers are computed in one pass.
+    """
+    servers, srv, ts, vals = _load(results)
+    keep = np.isfinite(vals) & (vals >= 0)
+    srv, ts, vals = srv[keep], ts[keep], vals[keep]
+    if not len(vals):
+        return {}
+
+    day = (ts.astype(np.int64) + tz_offset) // DAY
+    day_min = int(day.min())
+    n_days = int(day.max()) - day_min + 1
+    key = srv * n_days + (day - day_min)
+
+    # 그룹 키 + [0, 1)로 정규화한 값으로 한 번에 정렬 (np.lexsort보다 10배 이상 빠름)
+    scale = float(vals.max()) * (1 + 1e-9) + 1e-12
+    order = np.argsort(key + vals / scale)
+    key, vals = key[order], vals[order]
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    counts = np.diff(np.r_[starts, len(key)])
+    ends = starts + counts - 1
+
+    sums = np.add.reduceat(vals, starts)
+    avg = sums / counts
+    vmax = vals[ends]
+    vmin = vals[starts]
+
+    # linear interpolation, same as np.percentile(..., method="linear")
+    pos = (counts - 1) * (percentile / 100.0)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.ceil(pos).astype(np.int64)
+    frac = pos - lo
+    pct = vals[starts + lo] + (vals[starts + hi] - vals[starts + lo]) * frac
+
+    group_keys = key[starts]
+    group_srv = group_keys // n_days
+    group_day = group_keys % n_days + day_min
+
+    date_str = {
+        d: datetime.fromtimestamp(int(d) * DAY, tz=timezone.utc).strftime("%Y-%m-%d")
+        for d in np.unique(group_day).tolist()
+    }
+    pct_name = f"p{percentile:g}"
+    result: dict = {}
+    for s, d, a, mx, mn, p in zip(
+        group_srv.tolist(), group_day.tolist(),
+        avg.tolist(), vmax.tolist(), vmin.tolist(), pct.tolist(),
+    ):
+        result.setdefault(servers[s], {})[date_str[d]] = {
+            "avg": round(a, 2), "max": round(mx, 2), "min": round(mn, 2), pct_name: round(p, 2),
+        }
+    return result
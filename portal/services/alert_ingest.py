@@ -0,0 +1,264 @@
+"""Alertmanager webhook → alert_history, batched.
+
+The webhook only enqueues payloads; a single writer task drains the queue and
+flushes once WEBHOOK_BATCH_SIZE alerts are pending or WEBHOOK_FLUSH_INTERVAL
+seconds after the first pending one. A batch is applied with one lookup of the
+open rows for all of its fingerprints, one bulk INSERT and one bulk UPDATE,
+inside a single transaction, together with the matching alert_daily_summary
+increments (services.alert_rollup). Alerts are processed in arrival order, so
+a fingerprint that fires and resolves in the same batch behaves as it did when
+rows were handled one by one.
+"""
+import asyncio
+import os
+import re
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, run_db
+from models import AlertHistory
+from services import metrics
+from services.alert_rollup import Deltas
+
+# SQLite의 바인드 변수 제한(구버전 999) 안쪽으로 IN 목록을 나눔
+LOOKUP_CHUNK = 500
+
+BATCH_SIZE = int(os.getenv("WEBHOOK_BATCH_SIZE", "500"))
+FLUSH_INTERVAL = float(os.getenv("WEBHOOK_FLUSH_INTERVAL", "0.5"))
+FLUSH_RETRIES = int(os.getenv("WEBHOOK_FLUSH_RETRIES", "5"))
+
+
+_ISO_FRACTION = re.compile(r"(\.\d+)")
+
+
+def _resolved_at(ends_at: str):
+    return None if ends_at.startswith("0001") else ends_at
+
+
+def to_epoch(iso: Optional[str]) -> Optional[int]:
+    """Alertmanager RFC 3339 timestamp (nanosecond fraction, "Z") → epoch seconds."""
+    if not iso or iso.startswith("0001"):
+        return None
+    try:
+        return int(datetime.fromisoformat(
+            _ISO_FRACTION.sub("", iso, count=1).replace("Z", "+00:00")
+        ).timestamp())
+    except ValueError:
+        return None
+
+
+_OPEN_COLUMNS = (
+    AlertHistory.id, AlertHistory.fingerprint, AlertHistory.customer_id, AlertHistory.server_name,
+    AlertHistory.alert_name, AlertHistory.severity, AlertHistory.started_ts,
+)
+
+
+def _open_rows(db: Session, fingerprints: list[str]) -> dict[str, dict]:
+    """{fingerprint: row} of the oldest unresolved row per fingerprint."""
+    open_rows: dict[str, dict] = {}
+    for i in range(0, len(fingerprints), LOOKUP_CHUNK):
+        chunk = fingerprints[i:i + LOOKUP_CHUNK]
+        rows = db.execute(
+            select(*_OPEN_COLUMNS)
+            .where(AlertHistory.fingerprint.in_(chunk), AlertHistory.resolved_at.is_(None))
+            .order_by(AlertHistory.id.desc())
+        )
+        for row in rows:
+            open_rows[row.fingerprint] = dict(row._mapping)  # id 내림차순이므로 마지막 값이 가장 오래된 행
+    return open_rows
+
+
+def ingest_alerts(db: Session, alerts: list[dict]) -> dict:
+    """Apply webhook alerts and commit. Returns {"inserted": n, "resolved": n}."""
+    fingerprints = list({a.get("fingerprint", "") for a in alerts})
+    open_rows = _open_rows(db, fingerprints) if fingerprints else {}
+
+    new_rows: list[dict] = []
+    pending: dict[str, dict] = {}  # 이번 payload에서 새로 열린 (아직 미해결) 행
+    updates: dict[int, dict] = {}
+    resolved_rows: dict[int, dict] = {}  # updates 중 실제로 닫힌 기존 행
+    for alert in alerts:
+        fp = alert.get("fingerprint", "")
+        status = alert.get("status", "firing")
+        if status == "firing":
+            if fp in open_rows or fp in pending:
+                continue
+            labels = alert.get("labels", {})
+            pending[fp] = {
+                "fingerprint": fp,
+                "customer_id": labels.get("customer_id", ""),
+                "server_name": labels.get("server_name", ""),
+                "alert_name": labels.get("alertname", ""),
+                "status": "firing",
+                "severity": labels.get("severity", ""),
+                "message": alert.get("annotations", {}).get("description", ""),
+                "started_at": alert.get("startsAt", ""),
+                "resolved_at": None,
+                "started_ts": to_epoch(alert.get("startsAt")),
+                "resolved_ts": None,
+            }
+            new_rows.append(pending[fp])
+        elif status == "resolved":
+            resolved_at = _resolved_at(alert.get("endsAt", ""))
+            if fp in pending:
+                pending[fp].update(
+                    status="resolved", resolved_at=resolved_at, resolved_ts=to_epoch(resolved_at),
+                )
+                if resolved_at is not None:
+                    del pending[fp]
+            elif fp in open_rows:
+                row_id = open_rows[fp]["id"]
+                updates[row_id] = {
+                    "id": row_id, "status": "resolved",
+                    "resolved_at": resolved_at, "resolved_ts": to_epoch(resolved_at),
+                }
+                if resolved_at is not None:
+                    resolved_rows[row_id] = open_rows.pop(fp)
+
+    deltas = Deltas()
+    for row in new_rows:
+        deltas.fired(row)
+        deltas.resolved(row, row["resolved_ts"])
+    for row_id, row in resolved_rows.items():
+        deltas.resolved(row, updates[row_id]["resolved_ts"])
+
+    try:
+        if new_rows:
+            db.execute(insert(AlertHistory), new_rows)
+        if updates:
+            db.execute(update(AlertHistory), list(updates.values()))
+        deltas.apply(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {"inserted": len(new_rows), "resolved": len(updates)}
+
+
+# --- webhook intake queue ---------------------------------------------------
+
+_STOP = object()
+_queue: Optional[asyncio.Queue] = None
+_task: Optional[asyncio.Task] = None
+_stats = {
+    "queue_depth": 0,  # 큐에 있거나 쓰는 중인 알림 수
+    "received_payloads": 0,
+    "received_alerts": 0,
+    "written_alerts": 0,
+    "inserted": 0,
+    "resolved": 0,
+    "batches": 0,
+    "failed_flushes": 0,
+    "dropped_alerts": 0,
+    "last_flush_ms": None,
+    "max_flush_ms": 0.0,
+    "total_flush_ms": 0.0,
+    "last_error": None,
+}
+
+metrics.WEBHOOK_QUEUE_DEPTH.set_function(lambda: _stats["queue_depth"])
+
+
+def enqueue(alerts: list[dict]):
+    """Hand a webhook payload's alerts to the writer (see start()). Never blocks."""
+    _stats["received_payloads"] += 1
+    _stats["received_alerts"] += len(alerts)
+    if alerts:
+        _stats["queue_depth"] += len(alerts)
+        _queue.put_nowait(alerts)
+
+
+def _ingest_batch(alerts: list[dict]) -> dict:
+    db = SessionLocal()
+    try:
+        return ingest_alerts(db, alerts)
+    finally:
+        db.close()
+
+
+async def _flush(alerts: list[dict]):
+    for attempt in range(FLUSH_RETRIES + 1):
+        t0 = time.perf_counter()
+        try:
+            result = await run_db(_ingest_batch, alerts)
+        except Exception as e:
+            # 주로 SQLite 잠금 — 잠시 후 같은 배치를 다시 시도
+            _stats["failed_flushes"] += 1
+            metrics.WEBHOOK_FLUSH_FAILURES.inc()
+            _stats["last_error"] = str(e) or e.__class__.__name__
+            if attempt < FLUSH_RETRIES:
+                await asyncio.sleep(min(0.5 * 2 ** attempt, 10))
+            continue
+        ms = (time.perf_counter() - t0) * 1000
+        metrics.WEBHOOK_FLUSH_LATENCY.observe(ms / 1000)
+        metrics.WEBHOOK_BATCH_ALERTS.observe(len(alerts))
+        _stats["batches"] += 1
+        _stats["written_alerts"] += len(alerts)
+        _stats["inserted"] += result["inserted"]
+        _stats["resolved"] += result["resolved"]
+        _stats["last_flush_ms"] = round(ms, 2)
+        _stats["max_flush_ms"] = max(_stats["max_flush_ms"], round(ms, 2))
+        _stats["total_flush_ms"] += ms
+        return
+    _stats["dropped_alerts"] += len(alerts)
+    metrics.WEBHOOK_DROPPED.inc(len(alerts))
+    print(f"[portal] alert history: dropped {len(alerts)} alerts: {_stats['last_error']}")
+
+
+async def _run():
+    """Collect payloads into a batch until it is full or FLUSH_INTERVAL has passed."""
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await _queue.get()
+        if item is _STOP:
+            return
+        batch = list(item)
+        deadline = loop.time() + FLUSH_INTERVAL
+        stopping = False
+        while len(batch) < BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP:
+                stopping = True
+                break
+            batch.extend(item)
+        await _flush(batch)
+        _stats["queue_depth"] -= len(batch)
+        if stopping:
+            return
+
+
+def start():
+    global _queue, _task
+    if _task is None:
+        if _queue is None:
+            _queue = asyncio.Queue()
+        _task = asyncio.create_task(_run())
+
+
+async def stop():
+    """Flush everything queued so far, then stop the writer."""
+    global _task
+    if _task is not None:
+        _queue.put_nowait(_STOP)
+        await _task
+        _task = None
+
+
+def stats() -> dict:
+    batches = _stats["batches"]
+    return {
+        **{k: v for k, v in _stats.items() if k != "total_flush_ms"},
+        "avg_flush_ms": round(_stats["total_flush_ms"] / batches, 2) if batches else None,
+        "batch_size": BATCH_SIZE,
+        "flush_interval": FLUSH_INTERVAL,
+    }
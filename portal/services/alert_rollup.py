@@ -0,0 +1,172 @@
+"""alert_daily_summary: per-day alert counts and resolve times, kept incrementally.
+
+The webhook writer adds to the summary in the same transaction as the
+alert_history change: a new alert counts on its KST start day, and a resolve
+adds to that same day's resolved count and firing seconds. So MTTR for a day
+is firing_seconds / resolved_count. Retention deletes history rows but leaves
+the summary alone, so analytics can reach further back than the history does.
+
+Rebuild from alert_history (e.g. after upgrading, or to repair):
+
+    cd portal && python -m services.alert_rollup [--customer ID]
+
+The summary is the durable record, so a rebuild never overwrites days that
+retention may have trimmed. Retention deletes resolved alerts older than a
+cutoff. Per customer, the oldest surviving resolved alert marks where the
+trim ended. Only days after that day are recomputed. That day and earlier
+days are only filled in when they have no summary rows at all (first
+backfill after upgrading).
+"""
+import argparse
+import time
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from models import AlertDailySummary
+
+KST_OFFSET = 9 * 3600
+
+_Key = tuple[str, str, str, str, str]  # customer_id, date, server_name, alert_name, severity
+
+
+def kst_date(ts: Optional[int]) -> str:
+    """KST day of an epoch timestamp; alerts without a start time count on the current day."""
+    if ts is None:
+        ts = int(time.time())
+    return time.strftime("%Y-%m-%d", time.gmtime(ts + KST_OFFSET))
+
+
+def _key(row: dict) -> _Key:
+    return (
+        row["customer_id"] or "", kst_date(row["started_ts"]),
+        row["server_name"] or "", row["alert_name"] or "", row["severity"] or "",
+    )
+
+
+class Deltas:
+    """Summary increments collected while a webhook batch is applied."""
+
+    def __init__(self):
+        self._rows: dict[_Key, list[int]] = {}  # [count, resolved_count, firing_seconds]
+
+    def _get(self, key: _Key) -> list[int]:
+        return self._rows.setdefault(key, [0, 0, 0])
+
+    def fired(self, row: dict):
+        self._get(_key(row))[0] += 1
+
+    def resolved(self, row: dict, resolved_ts: Optional[int]):
+        """row: the alert_history columns as of firing (customer_id … started_ts)."""
+        if resolved_ts is None or row["started_ts"] is None:
+            return
+        acc = self._get(_key(row))
+        acc[1] += 1
+        acc[2] += max(resolved_ts - row["started_ts"], 0)
+
+    def apply(self, db: Session):
+        """Upsert-add into alert_daily_summary (caller commits)."""
+        if not self._rows:
+            return
+        stmt = insert(AlertDailySummary)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["customer_id", "date", "server_name", "alert_name", "severity"],
+            set_={
+                "count": AlertDailySummary.count + stmt.excluded.count,
+                "resolved_count": AlertDailySummary.resolved_count + stmt.excluded.resolved_count,
+                "firing_seconds": AlertDailySummary.firing_seconds + stmt.excluded.firing_seconds,
+            },
+        ), [
+            {
+                "customer_id": k[0], "date": k[1], "server_name": k[2], "alert_name": k[3],
+                "severity": k[4], "count": v[0], "resolved_count": v[1], "firing_seconds": v[2],
+            }
+            for k, v in self._rows.items()
+        ])
+
+
+# --- rebuild ---------------------------------------------------------------
+
+def _day(alias: str) -> str:
+    return (
+        f"date(coalesce({alias}.started_ts, CAST(strftime('%s', {alias}.received_at) AS INTEGER))"
+        f" + {KST_OFFSET}, 'unixepoch')"
+    )
+
+
+_WHERE = "(:cid IS NULL OR h.customer_id = :cid)"
+
+# 고객사별로 남아 있는 가장 오래된 해소 알림의 날짜 — 그 날 이전(포함)은 보존 정리로 잘렸을 수 있음
+_TRIMMED_UNTIL = f"""
+    SELECT coalesce(h.customer_id, '') AS cid,
+           date(min(h.started_ts) + {KST_OFFSET}, 'unixepoch') AS day
+    FROM alert_history h
+    WHERE h.resolved_at IS NOT NULL AND h.started_ts IS NOT NULL AND {_WHERE}
+    GROUP BY 1
+"""
+
+_DELETE_DAYS = text(f"""
+    DELETE FROM alert_daily_summary
+    WHERE (customer_id, date) IN (
+        SELECT d.cid, d.day
+        FROM (SELECT DISTINCT coalesce(h.customer_id, '') AS cid, {_day("h")} AS day
+              FROM alert_history h WHERE {_WHERE}) d
+        JOIN ({_TRIMMED_UNTIL}) t ON t.cid = d.cid AND d.day > t.day
+    )
+""")
+# 삭제된 날(재계산 대상)과 요약이 아예 없는 날만 채움
+_REBUILD = text(f"""
+    INSERT INTO alert_daily_summary
+        (customer_id, date, server_name, alert_name, severity, count, resolved_count, firing_seconds)
+    SELECT coalesce(h.customer_id, ''), {_day("h")},
+           coalesce(h.server_name, ''), coalesce(h.alert_name, ''), coalesce(h.severity, ''),
+           count(*),
+           sum(h.resolved_ts IS NOT NULL AND h.started_ts IS NOT NULL),
+           coalesce(sum(max(h.resolved_ts - h.started_ts, 0)), 0)
+    FROM alert_history h
+    WHERE {_WHERE} AND NOT EXISTS (
+        SELECT 1 FROM alert_daily_summary s
+        WHERE s.customer_id = coalesce(h.customer_id, '') AND s.date = {_day("h")}
+    )
+    GROUP BY 1, 2, 3, 4, 5
+""")
+
+
+def rebuild(db: Session, customer_id: Optional[str] = None) -> int:
+    """Recompute summary days that retention cannot have trimmed, and fill days
+    with no summary at all. Returns rows written."""
+    params = {"cid": customer_id}
+    db.execute(_DELETE_DAYS, params)
+    written = db.execute(_REBUILD, params).rowcount
+    db.commit()
+    return written
+
+
+def needs_backfill(db: Session) -> bool:
+    """True when there is history but no summary yet (first start after upgrading)."""
+    return bool(
+        db.execute(text("SELECT EXISTS (SELECT 1 FROM alert_history)")).scalar()
+        and not db.execute(text("SELECT EXISTS (SELECT 1 FROM alert_daily_summary)")).scalar()
+    )
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    parser = argparse.ArgumentParser(description="Rebuild alert_daily_summary from alert_history")
+    parser.add_argument("--customer", help="only this customer_id")
+    args = parser.parse_args(argv)
+
+    from database import SessionLocal, Base, engine
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        t0 = time.monotonic()
+        written = rebuild(db, args.customer)
+        print(f"[portal] alert rollup rebuilt: {written} summary rows in {time.monotonic() - t0:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,31 @@
 import os
-import httpx
-import yaml
+from database import SessionLocal, run_db
+from models import CustomerEmail
+from services import upstream
 from services.docker_mgr import restart_container
+from services.config_apply import DebouncedApplier
 
 CONFIG_DIR = os.getenv("CONFIG_DIR", "/monitoring_msp/config")
-AM_URL = os.getenv("ALERTMANAGER_URL", "http://alertmanager:9093")
+
+
+async def get_firing_alerts() -> list[dict]:
+    """Active, non-silenced alerts from Alertmanager. Raises on upstream errors."""
+    client = upstream.get_client(upstream.ALERTMANAGER)
+    resp = await client.get("/api/v2/alerts", params={"active": "true", "silenced": "false"})
+    resp.raise_for_status()
+    result = []
+    for a in resp.json():
+        labels = a.get("labels", {})
+        result.append({
+            "customer_id": labels.get("customer_id", ""),
+            "server_name": labels.get("server_name", ""),
+            "alert_name": labels.get("alertname", ""),
+            "severity": labels.get("severity", ""),
+            "starts_at": a.get("startsAt", ""),
+            "status": a.get("status", {}).get("state", ""),
+            "fingerprint": a.get("fingerprint", ""),
+        })
+    return result
 
 
 def get_alertmanager_config_path() -> str:
@@ -72,18 +93,45 @@ def generate_alertmanager_config(customers: list[dict]) -> str:
             ],
         })
 
+    import yaml  # 설정 생성 시에만 로드
+
     return yaml.dump(config, default_flow_style=False, allow_unicode=True)
 
 
-async def apply_alertmanager_config(customers: list[dict]) -> bool:
-    path = get_alertmanager_config_path()
-    content = generate_alertmanager_config(customers)
-    with open(path, "w") as f:
-        f.write(content)
+async def _reload() -> bool:
     # Hot-reload instead of restart (preserves alert state)
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.post(f"{AM_URL}/-/reload")
-            return resp.status_code == 200
+        resp = await upstream.get_client(upstream.ALERTMANAGER).post("/-/reload")
+        return resp.status_code == 200
     except Exception:
         return await restart_container("msp-alertmanager")
+
+
+def _load_customers() -> list[dict]:
+    """Enabled recipients per customer: [{ customer_id, emails: [str] }]"""
+    db = SessionLocal()
+    try:
+        customers: dict[str, list[str]] = {}
+        for e in db.query(CustomerEmail).filter(CustomerEmail.enabled == 1):
+            customers.setdefault(e.customer_id, []).append(e.email)
+    finally:
+        db.close()
+    return [{"customer_id": cid, "emails": elist} for cid, elist in customers.items()]
+
+
+async def _current_customers() -> list[dict]:
+    return await run_db(_load_customers)
+
+
+applier = DebouncedApplier(
+    "alertmanager", get_alertmanager_config_path, _current_customers, generate_alertmanager_config, _reload,
+)
+
+
+def request_apply() -> dict:
+    """Debounced apply of the recipients in the DB; see services.config_apply. Returns the apply status."""
+    return applier.request()
+
+
+def apply_status() -> dict:
+    return applier.status()
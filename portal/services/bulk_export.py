@@ -0,0 +1,145 @@
+"""All-customers report export: concurrent fetching, Excel rendering in a process pool, one zip."""
+import asyncio
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Optional
+
+from services import report_data
+
+FETCH_CONCURRENCY = int(os.getenv("BULK_FETCH_CONCURRENCY", "4"))
+RENDER_WORKERS = int(os.getenv("BULK_RENDER_WORKERS", "0")) or os.cpu_count() or 1
+JOB_TTL = int(os.getenv("BULK_JOB_TTL", "3600"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_jobs: dict[str, "BulkJob"] = {}
+
+
+class BulkJob:
+    def __init__(self, customer_ids: list[str], first: date, last: date, mode: str):
+        self.id = uuid.uuid4().hex
+        self.customer_ids = customer_ids
+        self.first = first
+        self.last = last
+        self.mode = mode
+        self.status = "running"
+        self.fetched = 0
+        self.rendered = 0
+        self.failed: dict[str, str] = {}
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.workdir = tempfile.mkdtemp(prefix="bulk-report-")
+        self.zip_path: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def filename(self) -> str:
+        return f"reports_{self.first:%Y-%m-%d}_{self.last:%Y-%m-%d}.zip"
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "from_date": self.first.isoformat(),
+            "to_date": self.last.isoformat(),
+            "total": len(self.customer_ids),
+            "fetched": self.fetched,
+            "rendered": self.rendered,
+            "failed": self.failed,
+            "error": self.error,
+            "elapsed": round((self.finished_at or time.time()) - self.created_at, 1),
+        }
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: 워커가 이벤트 루프/DB 커넥션을 상속하지 않도록
+        _pool = ProcessPoolExecutor(
+            max_workers=RENDER_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+async def _export_one(job: BulkJob, customer_id: str, sem: asyncio.Semaphore) -> Optional[str]:
+    async with sem:
+        stats = await report_data.collect_stats(customer_id, job.first, job.last, job.mode)
+    job.fetched += 1
+    from services import report_excel  # openpyxl — 리포트 생성 시에만 로드
+    path = os.path.join(job.workdir, f"report_{customer_id}_{job.first:%Y-%m-%d}_{job.last:%Y-%m-%d}.xlsx")
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(
+        _get_pool(), report_excel.render_to_path, path, customer_id, stats, job.first, job.last
+    )
+    job.rendered += 1
+    return path
+
+
+def _write_zip(zip_path: str, paths: list[str]):
+    # xlsx는 이미 압축된 포맷이라 STORED로 묶음
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_STORED) as zf:
+        for path in paths:
+            zf.write(path, arcname=os.path.basename(path))
+            os.remove(path)
+
+
+async def _run(job: BulkJob):
+    sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+    try:
+        results = await asyncio.gather(
+            *(_export_one(job, c, sem) for c in job.customer_ids), return_exceptions=True
+        )
+        paths = []
+        for customer_id, r in zip(job.customer_ids, results):
+            if isinstance(r, Exception):
+                job.failed[customer_id] = str(r) or r.__class__.__name__
+            else:
+                paths.append(r)
+        zip_path = os.path.join(job.workdir, job.filename)
+        await asyncio.to_thread(_write_zip, zip_path, paths)
+        job.zip_path = zip_path
+        job.status = "done"
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+    finally:
+        job.finished_at = time.time()
+
+
+def _cleanup_expired():
+    now = time.time()
+    for job_id, job in list(_jobs.items()):
+        if job.finished_at and now - job.finished_at > JOB_TTL:
+            shutil.rmtree(job.workdir, ignore_errors=True)
+            del _jobs[job_id]
+
+
+def start_job(customer_ids: list[str], first: date, last: date, mode: str = "daily") -> BulkJob:
+    _cleanup_expired()
+    job = BulkJob(customer_ids, first, last, mode)
+    _jobs[job.id] = job
+    job.task = asyncio.create_task(_run(job))
+    return job
+
+
+def get_job(job_id: str) -> Optional[BulkJob]:
+    return _jobs.get(job_id)
+
+
+async def shutdown():
+    global _pool
+    for job in _jobs.values():
+        if job.task and not job.task.done():
+            job.task.cancel()
+        shutil.rmtree(job.workdir, ignore_errors=True)
+    _jobs.clear()
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
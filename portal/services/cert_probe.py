@@ -0,0 +1,81 @@
+"""TLS certificate expiry of the public endpoint, probed in the background.
+
+Expiry changes at most once a day, so the handshake runs every
+CERT_REFRESH_INTERVAL seconds (sooner after a failure) and /api/system/status
+only reads the cached result.
+"""
+import asyncio
+import os
+import ssl
+from datetime import datetime, timezone
+from typing import Optional
+
+HOSTNAME = os.getenv("CERT_HOSTNAME", "grafana.tbit.co.kr")
+PORT = int(os.getenv("CERT_PORT", "443"))
+TIMEOUT = float(os.getenv("CERT_TIMEOUT", "5"))
+REFRESH_INTERVAL = float(os.getenv("CERT_REFRESH_INTERVAL", "3600"))
+RETRY_INTERVAL = float(os.getenv("CERT_RETRY_INTERVAL", "300"))
+
+_result: Optional[dict] = None
+_task: Optional[asyncio.Task] = None
+
+
+async def probe(hostname: str, port: int = PORT) -> dict:
+    checked_at = datetime.now(timezone.utc).isoformat()
+    writer = None
+    try:
+        ctx = ssl.create_default_context()
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(hostname, port, ssl=ctx, server_hostname=hostname),
+            TIMEOUT,
+        )
+        cert = writer.get_extra_info("peercert")
+        expiry = datetime.strptime(cert["notAfter"], "%b %d %H:%M:%S %Y %Z").replace(tzinfo=timezone.utc)
+        return {"hostname": hostname, "expires_at": expiry.isoformat(), "checked_at": checked_at}
+    except Exception as e:
+        return {"hostname": hostname, "error": str(e) or e.__class__.__name__, "checked_at": checked_at}
+    finally:
+        if writer is not None:
+            writer.close()
+            try:
+                await asyncio.wait_for(writer.wait_closed(), TIMEOUT)
+            except Exception:
+                pass
+
+
+def get() -> dict:
+    """Latest probe result; days_left is computed now so a cached result stays accurate."""
+    if _result is None:
+        return {"hostname": HOSTNAME, "pending": True}
+    if "expires_at" not in _result:
+        return dict(_result)
+    expiry = datetime.fromisoformat(_result["expires_at"])
+    return {**_result, "days_left": (expiry - datetime.now(timezone.utc)).days}
+
+
+async def refresh():
+    global _result
+    _result = await probe(HOSTNAME)
+
+
+async def _run():
+    while True:
+        await refresh()
+        await asyncio.sleep(RETRY_INTERVAL if "error" in _result else REFRESH_INTERVAL)
+
+
+def start():
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_run())
+
+
+async def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -0,0 +1,164 @@
+"""Debounced, diff-aware config file apply (Alertmanager config, vmalert rules).
+
+request() only marks the config dirty and (re)starts a short timer. Once the
+requests stop for CONFIG_APPLY_DEBOUNCE seconds (at most CONFIG_APPLY_MAX_WAIT
+after the first), the current input is loaded from the DB, rendered, compared
+and reloaded. Loading at flush time means the file always reflects the latest
+committed settings, whatever order concurrent edits finished in.
+If the rendered content hashes the same as what the service last loaded, the
+write and reload are skipped. Files are replaced atomically so the service
+never reads a half-written config.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from services import metrics
+
+DEBOUNCE = float(os.getenv("CONFIG_APPLY_DEBOUNCE", "2"))
+MAX_WAIT = float(os.getenv("CONFIG_APPLY_MAX_WAIT", "10"))
+
+
+def _sha256(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def write_atomic(path: str, content: str):
+    """Write to a temp file in the same directory, fsync, then rename over path."""
+    directory = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp, os.stat(path).st_mode & 0o777)
+        else:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class DebouncedApplier:
+    def __init__(
+        self,
+        name: str,
+        path: Callable[[], str],
+        load: Callable[[], Awaitable[Any]],
+        render: Callable[[Any], str],
+        reload: Callable[[], Awaitable[bool]],
+    ):
+        self.name = name
+        self._path = path
+        self._load = load
+        self._render = render
+        self._reload = reload
+        self._pending = False  # 마지막 apply 이후 설정이 바뀌었는지
+        self._first_request: Optional[float] = None
+        self._last_request: Optional[float] = None
+        self._coalesced = 0
+        self._loaded_hash: Optional[str] = None  # 서비스가 마지막으로 reload한 내용
+        self._loaded_known = False
+        self._task: Optional[asyncio.Task] = None
+        self._flush_now = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._status: dict = {
+            "state": "idle",
+            "last_result": None,  # applied | unchanged | failed
+            "last_applied_at": None,
+            "requests_coalesced": 0,
+            "error": None,
+        }
+
+    def request(self) -> dict:
+        """Mark the config changed and schedule an apply. Returns the status."""
+        now = time.monotonic()
+        if not self._pending:
+            self._first_request = now
+            self._coalesced = 0
+        self._pending = True
+        self._last_request = now
+        self._coalesced += 1
+        self._status["state"] = "pending"
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._wait_and_apply())
+        return self.status()
+
+    async def _wait_and_apply(self):
+        while self._pending:
+            delay = min(self._last_request + DEBOUNCE, self._first_request + MAX_WAIT) - time.monotonic()
+            if delay > 0 and not self._flush_now.is_set():
+                try:
+                    await asyncio.wait_for(self._flush_now.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.flush()
+
+    async def flush(self) -> Optional[bool]:
+        """Apply the current config now if it changed. Returns reload success, or None if nothing was pending."""
+        async with self._lock:
+            if not self._pending:
+                return None
+            # 읽기 전에 내려야 함 — 읽는 도중 들어온 변경은 다음 apply에서 반영
+            self._pending = False
+            coalesced, self._coalesced = self._coalesced, 0
+            self._status.update(state="applying", requests_coalesced=coalesced)
+            try:
+                result = await self._apply()
+                self._status.update(last_result=result, error=None)
+                ok = True
+            except Exception as e:
+                self._status.update(last_result="failed", error=str(e) or e.__class__.__name__)
+                ok = False
+            metrics.CONFIG_APPLIES.labels(self.name, self._status["last_result"]).inc()
+            self._status["last_applied_at"] = datetime.now(timezone.utc).isoformat()
+            self._status["state"] = "pending" if self._pending else "idle"
+            return ok
+
+    async def _apply(self) -> str:
+        path = self._path()
+        content = self._render(await self._load())
+        digest = _sha256(content)
+        if not self._loaded_known:
+            # 재시작 직후: 디스크의 파일이 이미 서비스에 로드된 것으로 간주
+            self._loaded_known = True
+            if os.path.exists(path):
+                with open(path) as f:
+                    self._loaded_hash = _sha256(f.read())
+        if digest == self._loaded_hash:
+            return "unchanged"
+        await asyncio.to_thread(write_atomic, path, content)
+        self._loaded_hash = None  # reload 실패 시 다음 apply에서 재시도하도록
+        t0 = time.perf_counter()
+        ok = await self._reload()
+        metrics.CONFIG_RELOAD_LATENCY.labels(self.name).observe(time.perf_counter() - t0)
+        if not ok:
+            raise Exception(f"{self.name} reload failed")
+        self._loaded_hash = digest
+        return "applied"
+
+    def status(self) -> dict:
+        pending_for = None
+        if self._pending and self._first_request is not None:
+            pending_for = round(time.monotonic() - self._first_request, 2)
+        return {**self._status, "pending_requests": self._coalesced, "pending_seconds": pending_for}
+
+    async def stop(self):
+        """Apply anything still pending right away (shutdown)."""
+        self._flush_now.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+        self._flush_now.clear()
@@ -1,36 +1,38 @@
+import asyncio
+
 import httpx
 
+from services import upstream
+
+
+def _client() -> httpx.AsyncClient:
+    return upstream.get_client(upstream.DOCKER)
+
 
 async def get_container_status(container_name: str) -> dict:
     try:
-        transport = httpx.AsyncHTTPTransport(uds="/var/run/docker.sock")
-        async with httpx.AsyncClient(transport=transport, base_url="http://docker") as client:
-            resp = await client.get(f"/containers/{container_name}/json")
-            if resp.status_code == 404:
-                return {"name": container_name, "status": "not_found", "running": False}
-            data = resp.json()
-            return {
-                "name": container_name,
-                "status": data["State"]["Status"],
-                "running": data["State"]["Running"],
-                "started_at": data["State"]["StartedAt"],
-            }
+        resp = await _client().get(f"/containers/{container_name}/json")
+        if resp.status_code == 404:
+            return {"name": container_name, "status": "not_found", "running": False}
+        data = resp.json()
+        return {
+            "name": container_name,
+            "status": data["State"]["Status"],
+            "running": data["State"]["Running"],
+            "started_at": data["State"]["StartedAt"],
+        }
     except Exception as e:
         return {"name": container_name, "status": "unknown", "running": False, "error": str(e)}
 
 
 async def restart_container(container_name: str) -> bool:
     try:
-        transport = httpx.AsyncHTTPTransport(uds="/var/run/docker.sock")
-        async with httpx.AsyncClient(transport=transport, base_url="http://docker") as client:
-            resp = await client.post(f"/containers/{container_name}/restart", timeout=30.0)
-            return resp.status_code == 204
+        resp = await _client().post(f"/containers/{container_name}/restart", timeout=30.0)
+        return resp.status_code == 204
     except Exception:
         return False
 
 
 async def get_all_container_statuses(names: list[str]) -> list[dict]:
-    results = []
-    for name in names:
-        results.append(await get_container_status(name))
-    return results
+    # 공유 UDS 클라이언트로 동시에 조회 (get_container_status는 예외를 내지 않음)
+    return list(await asyncio.gather(*(get_container_status(name) for name in names)))
@@ -0,0 +1,194 @@
+"""In-memory fleet snapshot kept fresh by a background refresher.
+
+Dashboard endpoints read the snapshot instead of querying VictoriaMetrics and
+Alertmanager per request, so upstream load no longer scales with open tabs.
+If a refresh fails the previous snapshot keeps being served (stale).
+Changes between refreshes are published to services.fleet_events.
+"""
+import asyncio
+import os
+import time
+from typing import Optional
+
+from services import victoriametrics as vm
+from services import alertmanager as am_svc
+from services import fleet_events
+
+REFRESH_INTERVAL = float(os.getenv("FLEET_REFRESH_INTERVAL", "15"))
+REFRESH_TIMEOUT = float(os.getenv("FLEET_REFRESH_TIMEOUT", "10"))
+# 스냅샷이 없고 직전 조회가 실패했으면 이 시간 동안은 재조회 없이 바로 503
+RETRY_AFTER = float(os.getenv("FLEET_RETRY_AFTER", "5"))
+
+
+class _Part:
+    def __init__(self, name: str, fetch):
+        self.name = name
+        self.fetch = fetch
+        self.data: Optional[list] = None
+        self.updated_at: Optional[float] = None  # monotonic
+        self.error: Optional[str] = None
+        self.failed_at: Optional[float] = None  # monotonic
+        self._inflight: Optional[asyncio.Task] = None
+
+    def age(self) -> Optional[float]:
+        if self.updated_at is None:
+            return None
+        return time.monotonic() - self.updated_at
+
+    def recently_failed(self) -> bool:
+        return self.failed_at is not None and time.monotonic() - self.failed_at < RETRY_AFTER
+
+    async def refresh(self) -> bool:
+        """Fetch once; concurrent callers share the same in-flight fetch."""
+        if self._inflight is None:
+            self._inflight = asyncio.create_task(self._refresh())
+            self._inflight.add_done_callback(self._clear_inflight)
+        # 한 호출자가 취소돼도 다른 대기자의 조회는 계속
+        return await asyncio.shield(self._inflight)
+
+    def _clear_inflight(self, task: asyncio.Task):
+        if self._inflight is task:
+            self._inflight = None
+
+    async def _refresh(self) -> bool:
+        try:
+            data = await asyncio.wait_for(self.fetch(), timeout=REFRESH_TIMEOUT)
+        except Exception as e:
+            self.error = str(e) or e.__class__.__name__
+            self.failed_at = time.monotonic()
+            return False
+        self.data = data
+        self.updated_at = time.monotonic()
+        self.error = None
+        self.failed_at = None
+        return True
+
+
+servers = _Part("servers", vm.get_fleet_snapshot)
+alerts = _Part("alerts", am_svc.get_firing_alerts)
+
+_task: Optional[asyncio.Task] = None
+
+
+async def refresh():
+    """Refresh both parts concurrently; a failing part keeps its previous data."""
+    prev_servers, prev_alerts = servers.data, alerts.data
+    await asyncio.gather(servers.refresh(), alerts.refresh())
+    if prev_servers is not None and servers.data is not prev_servers:
+        _publish_server_diff(prev_servers, servers.data)
+    if prev_alerts is not None and alerts.data is not prev_alerts:
+        _publish_alert_diff(prev_alerts, alerts.data)
+
+
+def _server_key(s: dict) -> tuple[str, str]:
+    return (s["customer_id"], s["server_name"])
+
+
+def _publish_server_diff(prev: list[dict], new: list[dict]):
+    """Only online/offline flips, new and removed servers are pushed.
+
+    Compares the online flag each snapshot stored when it was fetched. Going
+    offline only takes time passing (last_seen stops moving), so re-evaluating
+    both sides now would never see that flip.
+    """
+    prev_online = {_server_key(s): s["online"] for s in prev}
+    new_keys = set()
+    for s in new:
+        key = _server_key(s)
+        new_keys.add(key)
+        if prev_online.get(key) != s["online"]:
+            fleet_events.publish("server", s)
+    for key in prev_online.keys() - new_keys:
+        fleet_events.publish("server_removed", {"customer_id": key[0], "server_name": key[1]})
+
+
+def _publish_alert_diff(prev: list[dict], new: list[dict]):
+    prev_fps = {a["fingerprint"] for a in prev}
+    new_fps = {a["fingerprint"] for a in new}
+    for a in new:
+        if a["fingerprint"] not in prev_fps:
+            fleet_events.publish("alert", {"action": "fired", **a})
+    for fp in prev_fps - new_fps:
+        fleet_events.publish("alert", {"action": "resolved", "fingerprint": fp})
+
+
+def apply_webhook_alerts(payload_alerts: list[dict]):
+    """Fold Alertmanager webhook alerts into the snapshot and push them immediately."""
+    current = {a["fingerprint"]: a for a in alerts.data or []}
+    for alert in payload_alerts:
+        fp = alert.get("fingerprint", "")
+        if not fp:
+            continue
+        labels = alert.get("labels", {})
+        if alert.get("status", "firing") == "firing":
+            if fp in current:
+                continue
+            entry = {
+                "customer_id": labels.get("customer_id", ""),
+                "server_name": labels.get("server_name", ""),
+                "alert_name": labels.get("alertname", ""),
+                "severity": labels.get("severity", ""),
+                "starts_at": alert.get("startsAt", ""),
+                "status": "active",
+                "fingerprint": fp,
+            }
+            current[fp] = entry
+            fleet_events.publish("alert", {"action": "fired", **entry})
+        elif current.pop(fp, None) is not None:
+            fleet_events.publish("alert", {"action": "resolved", "fingerprint": fp})
+    if alerts.data is not None:
+        alerts.data = list(current.values())
+
+
+async def get(part: _Part) -> _Part:
+    """Return the part, fetching inline if nothing has been loaded yet.
+
+    Waiters share one fetch. After a failed fetch, callers get the empty part
+    right away (routers answer 503) until RETRY_AFTER has passed.
+    """
+    if part.data is None and not part.recently_failed():
+        await part.refresh()
+    return part
+
+
+def discard_server(customer_id: str, server_name: str):
+    """Drop a purged server from the snapshot without waiting for the next refresh."""
+    if servers.data is not None:
+        servers.data = [
+            s for s in servers.data
+            if (s["customer_id"], s["server_name"]) != (customer_id, server_name)
+        ]
+
+
+def headers(part: _Part) -> dict:
+    age = part.age()
+    result = {"X-Snapshot-Age": f"{age:.1f}" if age is not None else "-1"}
+    if part.error:
+        result["X-Snapshot-Stale"] = "1"
+    return result
+
+
+async def _run():
+    while True:
+        try:
+            await refresh()
+        except Exception as e:
+            print(f"[portal] fleet refresh failed: {e}")
+        await asyncio.sleep(REFRESH_INTERVAL)
+
+
+def start():
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_run())
+
+
+async def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
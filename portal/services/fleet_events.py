@@ -0,0 +1,38 @@
+"""In-process fan-out of fleet changes to Server-Sent Events subscribers."""
+import asyncio
+import json
+from contextlib import contextmanager
+
+QUEUE_SIZE = 1000
+
+_subscribers: set[asyncio.Queue] = set()
+
+
+def publish(event: str, data: dict):
+    """Queue an event for every subscriber. Slow subscribers are told to resync."""
+    for q in list(_subscribers):
+        try:
+            q.put_nowait((event, data))
+        except asyncio.QueueFull:
+            # 밀린 구독자는 버리고 전체 재조회를 요청
+            while not q.empty():
+                q.get_nowait()
+            q.put_nowait(("resync", {}))
+
+
+@contextmanager
+def subscribe():
+    q: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    _subscribers.add(q)
+    try:
+        yield q
+    finally:
+        _subscribers.discard(q)
+
+
+def subscriber_count() -> int:
+    return len(_subscribers)
+
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
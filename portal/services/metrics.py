@@ -0,0 +1,132 @@
+"""Prometheus metrics for the portal itself, exposed on /metrics.
+
+VictoriaMetrics scrapes the endpoint (config/victoriametrics/scrape.yml), so the
+portal's request latency, upstream calls, webhook batches and config reloads
+can be graphed next to everything else. Route labels use the path template
+(/api/servers/{customer_id}/...), never the raw path, to keep cardinality fixed.
+"""
+import time
+
+import httpx
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match
+
+from services import timing
+
+# 포털 API는 대부분 수 ms~수백 ms, 리포트/벌크는 수십 초
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HTTP_REQUESTS = Counter(
+    "portal_http_requests_total", "Portal HTTP requests", ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "portal_http_request_duration_seconds", "Portal HTTP request latency (until the response is sent)",
+    ["method", "route"], buckets=_LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "portal_http_requests_in_flight", "Portal HTTP requests being handled", ["method", "route"],
+)
+
+UPSTREAM_LATENCY = Histogram(
+    "portal_upstream_request_duration_seconds", "Calls from the portal to upstream services (until response headers)",
+    ["upstream", "method"], buckets=_LATENCY_BUCKETS,
+)
+UPSTREAM_ERRORS = Counter(
+    "portal_upstream_errors_total", "Failed upstream calls: transport errors and 5xx responses",
+    ["upstream", "kind"],
+)
+
+WEBHOOK_BATCH_ALERTS = Histogram(
+    "portal_webhook_batch_alerts", "Alerts per alert-history write batch",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500),
+)
+WEBHOOK_FLUSH_LATENCY = Histogram(
+    "portal_webhook_flush_duration_seconds", "Alert-history batch write time",
+    buckets=_LATENCY_BUCKETS,
+)
+WEBHOOK_FLUSH_FAILURES = Counter("portal_webhook_flush_failures_total", "Failed alert-history batch writes")
+WEBHOOK_DROPPED = Counter("portal_webhook_dropped_alerts_total", "Alerts dropped after the write retries ran out")
+WEBHOOK_QUEUE_DEPTH = Gauge("portal_webhook_queue_depth", "Alerts waiting to be written to alert history")
+
+CONFIG_RELOAD_LATENCY = Histogram(
+    "portal_config_reload_duration_seconds", "Alertmanager/vmalert reload time after a config change",
+    ["service"], buckets=_LATENCY_BUCKETS,
+)
+CONFIG_APPLIES = Counter(
+    "portal_config_applies_total", "Debounced config applies by result (applied|unchanged|failed)",
+    ["service", "result"],
+)
+
+
+def metrics_endpoint(request: Request) -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Wraps an upstream client's transport to time every call and count failures."""
+
+    def __init__(self, upstream: str, transport: httpx.AsyncBaseTransport):
+        self._upstream = upstream
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        t0 = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TimeoutException:
+            UPSTREAM_ERRORS.labels(self._upstream, "timeout").inc()
+            raise
+        except httpx.TransportError:
+            UPSTREAM_ERRORS.labels(self._upstream, "transport").inc()
+            raise
+        finally:
+            elapsed = time.perf_counter() - t0
+            UPSTREAM_LATENCY.labels(self._upstream, request.method).observe(elapsed)
+            timing.record(self._upstream, elapsed)
+        if response.status_code >= 500:
+            UPSTREAM_ERRORS.labels(self._upstream, "5xx").inc()
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def _route_template(app, scope) -> str:
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware: per-route request count, latency and in-flight gauge."""
+
+    def __init__(self, app, router_app=None):
+        self.app = app
+        self._router_app = router_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        method = scope["method"]
+        route = _route_template(self._router_app, scope)
+        status = 500
+        in_flight = HTTP_IN_FLIGHT.labels(method, route)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - t0)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
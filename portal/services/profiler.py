@@ -0,0 +1,220 @@
+"""On-demand sampling profiler for a single request (admins only).
+
+An admin sends `X-Profile: 1` or `?profile=1`, and that one request runs with
+a sampler thread recording every PROFILE_INTERVAL_MS what each busy thread
+is executing. The samples cover the event loop and the DB, auth and report
+threads. They are written as speedscope JSON (https://www.speedscope.app) to
+PROFILE_DIR, and the response carries the profile id in X-Profile-Id.
+Fetch the file from /api/system/profiles.
+
+The sampler sees the whole process. Other requests running at the same time
+show up on the event loop thread too. Requests without the flag pay only the
+header/query check.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import parse_qs
+
+import anyio
+from jose import JWTError
+
+from auth import verify_token_cached
+
+_DATA_DIR = os.path.dirname(os.getenv("DB_PATH", "/app/data/portal.db"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(_DATA_DIR, "profiles"))
+INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "300"))
+KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+
+PROFILE_ID = re.compile(r"^[0-9]{8}T[0-9]{6}-[A-Za-z0-9_-]+\.speedscope\.json$")
+
+# 대기 중인 스레드의 최상단 프레임 — 샘플에서 제외
+_IDLE = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+}
+
+
+def _idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE
+
+
+class Sampler:
+    """Collects stacks of all busy threads until stop()."""
+
+    def __init__(self):
+        self._frames: dict[tuple, int] = {}  # (name, file, line) → index
+        self._samples: dict[str, list[tuple[list[int], float]]] = {}  # thread → [(stack, weight_ms)]
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def start(self) -> "Sampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> float:
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        return self.elapsed
+
+    def _frame_index(self, frame) -> int:
+        code = frame.f_code
+        key = (code.co_name, code.co_filename, frame.f_lineno)
+        index = self._frames.get(key)
+        if index is None:
+            index = self._frames[key] = len(self._frames)
+        return index
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        last = time.perf_counter()
+        deadline = last + MAX_SECONDS
+        while not self._stop.wait(INTERVAL):
+            now = time.perf_counter()
+            weight = (now - last) * 1000
+            last = now
+            if now > deadline:
+                break
+            for ident, frame in sys._current_frames().items():
+                if ident == me or _idle(frame):
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_index(frame))
+                    frame = frame.f_back
+                stack.reverse()
+                self._samples.setdefault(names.get(ident, str(ident)), []).append((stack, weight))
+
+    def speedscope(self, name: str) -> dict:
+        frames = [None] * len(self._frames)
+        for (func, file, line), index in self._frames.items():
+            frames[index] = {"name": func, "file": file, "line": line}
+        profiles = []
+        for thread, samples in sorted(self._samples.items(), key=lambda kv: -len(kv[1])):
+            total = sum(w for _, w in samples)
+            profiles.append({
+                "type": "sampled",
+                "name": f"{thread} ({len(samples)} samples)",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(total, 3),
+                "samples": [s for s, _ in samples],
+                "weights": [round(w, 3) for _, w in samples],
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "msp-portal",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+
+def _slug(path: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_")[:60] or "root"
+
+
+def _save(profile: dict, profile_id: str):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(PROFILE_DIR, profile_id), "w") as f:
+        json.dump(profile, f, separators=(",", ":"))
+    # 오래된 프로파일 정리
+    for old in list_profiles()[KEEP:]:
+        try:
+            os.unlink(os.path.join(PROFILE_DIR, old["id"]))
+        except FileNotFoundError:
+            pass
+
+
+def list_profiles() -> list[dict]:
+    """Saved profiles, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    result = []
+    for name in os.listdir(PROFILE_DIR):
+        if not PROFILE_ID.match(name):
+            continue
+        st = os.stat(os.path.join(PROFILE_DIR, name))
+        result.append({
+            "id": name,
+            "size": st.st_size,
+            "created_at": datetime.fromtimestamp(st.st_mtime, timezone.utc).isoformat(),
+        })
+    result.sort(key=lambda p: p["id"], reverse=True)
+    return result
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, profile_id)
+    return path if os.path.isfile(path) else None
+
+
+def _requested(scope) -> bool:
+    for key, value in scope["headers"]:
+        if key == b"x-profile" and value not in (b"", b"0"):
+            return True
+    if b"profile=" in scope["query_string"]:
+        values = parse_qs(scope["query_string"].decode()).get("profile", [])
+        return any(v not in ("", "0") for v in values)
+    return False
+
+
+def _is_admin(scope) -> bool:
+    for key, value in scope["headers"]:
+        if key == b"authorization":
+            scheme, _, token = value.decode().partition(" ")
+            if scheme.lower() != "bearer":
+                return False
+            try:
+                claims = verify_token_cached(token)
+            except JWTError:
+                return False
+            return claims.get("scope") is None and claims.get("role") == "admin"
+    return False
+
+
+class ProfileMiddleware:
+    """ASGI middleware: profiles requests flagged with X-Profile / ?profile=1 by an admin."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _requested(scope) or not _is_admin(scope):
+            return await self.app(scope, receive, send)
+
+        started = datetime.now(timezone.utc)
+        profile_id = f"{started:%Y%m%dT%H%M%S}-{scope['method']}-{_slug(scope['path'])}-{uuid.uuid4().hex[:6]}.speedscope.json"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        sampler = Sampler().start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = await anyio.to_thread.run_sync(sampler.stop)
+            name = f"{scope['method']} {scope['path']} {started.isoformat()} ({elapsed * 1000:.0f}ms)"
+            try:
+                await anyio.to_thread.run_sync(_save, sampler.speedscope(name), profile_id)
+            except OSError as e:
+                print(f"[portal] saving profile {profile_id} failed: {e}")
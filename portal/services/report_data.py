@@ -0,0 +1,274 @@
+"""Range report data: per-server daily stats from VictoriaMetrics and the rollup table.
+
+Closed days (before today, KST) are read from daily_stats once materialized;
+only missing days and today are queried from VictoriaMetrics.
+"""
+import os
+import asyncio
+from datetime import datetime, timezone, timedelta, date
+
+from sqlalchemy.dialects.sqlite import insert
+
+from database import SessionLocal, run_db
+from models import DailyStat, DailyRollup
+from services import timing
+from services import victoriametrics as vm
+
+TZ_KST = timezone(timedelta(hours=9))
+DAY = 86400
+# Subquery resolution for daily avg/max computed inside VictoriaMetrics
+DAILY_RESOLUTION = os.getenv("REPORT_DAILY_RESOLUTION", "1m")
+
+# Metrics that get a daily max column in the report (the rest only avg)
+MAX_METRICS = ("cpu", "mem")
+ALL_METRICS = ("cpu", "mem", "disk", "net_in", "net_out", "disk_read", "disk_write")
+
+# Nightly rollup: run time (KST), how many past days to check for gaps (keep equal to
+# VictoriaMetrics' VM_RETENTION — older days can no longer be queried), how many recent
+# closed days to recompute every night for late samples, customers in parallel
+ROLLUP_AT = os.getenv("ROLLUP_AT", "00:30")
+ROLLUP_BACKFILL_DAYS = int(os.getenv("ROLLUP_BACKFILL_DAYS", "90"))
+ROLLUP_RECOMPUTE_DAYS = int(os.getenv("ROLLUP_RECOMPUTE_DAYS", "2"))
+ROLLUP_CONCURRENCY = int(os.getenv("ROLLUP_CONCURRENCY", "4"))
+
+
+def report_queries(cid: str) -> dict[str, str]:
+    return {
+        "cpu": f'100 - avg by(server_name)(rate(node_cpu_seconds_total{{mode="idle",customer_id="{cid}"}}[5m])) * 100',
+        "mem": f'(1 - node_memory_MemAvailable_bytes{{customer_id="{cid}"}} / node_memory_MemTotal_bytes{{customer_id="{cid}"}}) * 100',
+        "disk": f'(1 - node_filesystem_avail_bytes{{fstype!~"tmpfs|devtmpfs|overlay|squashfs",customer_id="{cid}",mountpoint="/"}} / node_filesystem_size_bytes{{fstype!~"tmpfs|devtmpfs|overlay|squashfs",customer_id="{cid}",mountpoint="/"}}) * 100',
+        "net_in": f'sum by(server_name)(rate(node_network_receive_bytes_total{{customer_id="{cid}",device!~"lo|docker.*|veth.*|br.*"}}[5m])) / 1048576',
+        "net_out": f'sum by(server_name)(rate(node_network_transmit_bytes_total{{customer_id="{cid}",device!~"lo|docker.*|veth.*|br.*"}}[5m])) / 1048576',
+        "disk_read": f'sum by(server_name)(rate(node_disk_read_bytes_total{{customer_id="{cid}"}}[5m])) / 1048576',
+        "disk_write": f'sum by(server_name)(rate(node_disk_written_bytes_total{{customer_id="{cid}"}}[5m])) / 1048576',
+    }
+
+
+def _ts_to_date(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=TZ_KST).strftime("%Y-%m-%d")
+
+
+def kst_midnight(d: date) -> int:
+    return int(datetime(d.year, d.month, d.day, tzinfo=TZ_KST).timestamp())
+
+
+def _merge_daily(stat: str, results: list, date_of, into: dict):
+    """Fold one-point-per-day results into {server_name: {date: {stat: x}}}."""
+    for r in results:
+        server = r["metric"].get("server_name", "unknown")
+        points = r.get("values") or ([r["value"]] if "value" in r else [])
+        for ts, val in points:
+            try:
+                v = float(val)
+            except (ValueError, TypeError):
+                continue
+            if v < 0 or v != v:  # NaN
+                continue
+            into.setdefault(server, {}).setdefault(date_of(float(ts)), {})[stat] = round(v, 2)
+
+
+async def fetch_raw(queries: dict[str, str], start_ts: int, end_ts: int) -> dict:
+    """Hourly samples aggregated into daily avg/max in Python."""
+    from services import aggregation  # numpy — 리포트 생성 시에만 로드
+    results = await asyncio.gather(
+        *(vm.query_range_chunked(q, start_ts, end_ts) for q in queries.values())
+    )
+    with timing.span("aggregate"):
+        return {name: aggregation.daily_stats(r) for name, r in zip(queries, results)}
+
+
+async def fetch_daily(
+    queries: dict[str, str], first_day: date, last_day: date, max_metrics=MAX_METRICS
+) -> dict:
+    """Daily avg/max computed by VictoriaMetrics, one point per server per day.
+
+    Each closed day D is evaluated at the following KST midnight with a 1d
+    window. Today (if in range) is an instant query over the elapsed part of the day.
+    """
+    now = datetime.now(TZ_KST)
+    today = now.date()
+    today_str = today.strftime("%Y-%m-%d")
+    now_ts = int(now.timestamp())
+    closed_last = min(last_day, today - timedelta(days=1))
+
+    jobs = []  # (metric, stat, coroutine, date_of)
+    for name, expr in queries.items():
+        stats = ("avg", "max") if name in max_metrics else ("avg",)
+        for stat in stats:
+            if first_day <= closed_last:
+                q = f"{stat}_over_time(({expr})[1d:{DAILY_RESOLUTION}])"
+                jobs.append((name, stat, vm.query_range_chunked(
+                    q, kst_midnight(first_day) + DAY, kst_midnight(closed_last) + DAY, DAY, align=False,
+                ), lambda ts: _ts_to_date(ts - DAY)))
+            if first_day <= today <= last_day:
+                window = max(now_ts - kst_midnight(today), 60)
+                q = f"{stat}_over_time(({expr})[{window}s:{DAILY_RESOLUTION}])"
+                jobs.append((name, stat, vm.query_instant(q, now_ts), lambda ts: today_str))
+
+    results = await asyncio.gather(*(job[2] for job in jobs))
+    data = {name: {} for name in queries}
+    with timing.span("aggregate"):
+        for (name, stat, _, date_of), r in zip(jobs, results):
+            _merge_daily(stat, r, date_of, data[name])
+    return data
+
+
+def kst_today() -> date:
+    return datetime.now(TZ_KST).date()
+
+
+def date_range(first: date, last: date) -> list[str]:
+    return [(first + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((last - first).days + 1)]
+
+
+def _merge_stats(into: dict, stats: dict):
+    for metric, servers in stats.items():
+        for server, days in servers.items():
+            target = into.setdefault(metric, {}).setdefault(server, {})
+            for d, values in days.items():
+                target.setdefault(d, {}).update(values)
+
+
+def _load_rollups(customer_id: str, first: str, last: str) -> tuple[dict, set[str]]:
+    """Returns (stats, dates already materialized) for a closed date range."""
+    db = SessionLocal()
+    try:
+        covered = {
+            r.date for r in db.query(DailyRollup.date).filter(
+                DailyRollup.customer_id == customer_id,
+                DailyRollup.date >= first,
+                DailyRollup.date <= last,
+            )
+        }
+        stats: dict = {}
+        rows = db.query(DailyStat).filter(
+            DailyStat.customer_id == customer_id,
+            DailyStat.date >= first,
+            DailyStat.date <= last,
+        )
+        for r in rows:
+            values = {"avg": r.avg}
+            if r.max is not None:
+                values["max"] = r.max
+            stats.setdefault(r.metric, {}).setdefault(r.server_name, {})[r.date] = values
+        return stats, covered
+    finally:
+        db.close()
+
+
+def _store_rollups(customer_id: str, stats: dict, dates: list[str]):
+    """Upsert stats for the given closed dates and mark them materialized."""
+    wanted = set(dates)
+    rows = [
+        {
+            "customer_id": customer_id, "date": d, "server_name": server, "metric": metric,
+            "avg": values.get("avg"), "max": values.get("max"),
+        }
+        for metric, servers in stats.items()
+        for server, days in servers.items()
+        for d, values in days.items()
+        if d in wanted
+    ]
+    now = datetime.now(timezone.utc).isoformat()
+    db = SessionLocal()
+    try:
+        if rows:
+            stmt = insert(DailyStat)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["customer_id", "date", "server_name", "metric"],
+                set_={"avg": stmt.excluded.avg, "max": stmt.excluded.max},
+            ), rows)
+        stmt = insert(DailyRollup)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["customer_id", "date"],
+            set_={"computed_at": stmt.excluded.computed_at},
+        ), [{"customer_id": customer_id, "date": d, "computed_at": now} for d in dates])
+        db.commit()
+    finally:
+        db.close()
+
+
+async def rollup_days(customer_id: str, first: date, last: date) -> dict:
+    """Query closed days [first, last] from VictoriaMetrics and materialize them."""
+    stats = await fetch_daily(report_queries(customer_id), first, last, max_metrics=ALL_METRICS)
+    await run_db(_store_rollups, customer_id, stats, date_range(first, last))
+    return stats
+
+
+async def collect_stats(customer_id: str, first: date, last: date, mode: str = "daily") -> dict:
+    """{metric: {server_name: {date: {"avg", "max"}}}} for a report range."""
+    queries = report_queries(customer_id)
+    if mode == "raw":
+        start_ts = kst_midnight(first)
+        end_ts = kst_midnight(last) + DAY - 1
+        return await fetch_raw(queries, start_ts, end_ts)
+
+    today = kst_today()
+    closed_last = min(last, today - timedelta(days=1))
+    stats: dict = {name: {} for name in queries}
+    jobs = []
+
+    if first <= closed_last:
+        stored, covered = await run_db(
+            _load_rollups, customer_id, first.isoformat(), closed_last.isoformat()
+        )
+        _merge_stats(stats, stored)
+        missing = [d for d in date_range(first, closed_last) if d not in covered]
+        if missing:
+            jobs.append(rollup_days(
+                customer_id, date.fromisoformat(missing[0]), date.fromisoformat(missing[-1])
+            ))
+    if first <= today <= last:
+        jobs.append(fetch_daily(queries, today, today))
+
+    for fetched in await asyncio.gather(*jobs):
+        _merge_stats(stats, fetched)
+    return stats
+
+
+def _missing_dates(customer_id: str, dates: list[str]) -> list[str]:
+    db = SessionLocal()
+    try:
+        covered = {
+            r.date for r in db.query(DailyRollup.date).filter(
+                DailyRollup.customer_id == customer_id,
+                DailyRollup.date >= dates[0],
+                DailyRollup.date <= dates[-1],
+            )
+        }
+    finally:
+        db.close()
+    return [d for d in dates if d not in covered]
+
+
+def _contiguous_runs(dates: list[str]) -> list[tuple[date, date]]:
+    """Sorted dates → [(first, last)] of consecutive days."""
+    runs: list[tuple[date, date]] = []
+    for d in map(date.fromisoformat, dates):
+        if runs and d - runs[-1][1] == timedelta(days=1):
+            runs[-1] = (runs[-1][0], d)
+        else:
+            runs.append((d, d))
+    return runs
+
+
+async def nightly_rollup():
+    """Materialize every gap in the last ROLLUP_BACKFILL_DAYS for every customer and
+    recompute the last ROLLUP_RECOMPUTE_DAYS closed days so late samples are included."""
+    yesterday = kst_today() - timedelta(days=1)
+    dates = date_range(yesterday - timedelta(days=ROLLUP_BACKFILL_DAYS - 1), yesterday)
+    recompute = set(dates[-ROLLUP_RECOMPUTE_DAYS:]) if ROLLUP_RECOMPUTE_DAYS > 0 else set()
+    customers = await vm.get_customers()
+    sem = asyncio.Semaphore(ROLLUP_CONCURRENCY)
+
+    async def one(customer_id: str):
+        async with sem:
+            missing = set(await run_db(_missing_dates, customer_id, dates))
+            # 빈 구간만 조회 — 첫 실행에서는 보존 기간 전체
+            for first, last in _contiguous_runs(sorted(missing | recompute)):
+                await rollup_days(customer_id, first, last)
+
+    results = await asyncio.gather(*(one(c) for c in customers), return_exceptions=True)
+    failed = [c for c, r in zip(customers, results) if isinstance(r, Exception)]
+    if failed:
+        raise Exception(f"rollup failed for {len(failed)}/{len(customers)} customers: {', '.join(failed[:5])}")
@@ -0,0 +1,120 @@
+"""Range report xlsx rendering with openpyxl's write-only mode.
+
+Rows are streamed to disk as they are generated, so memory stays flat no
+matter how many server-days the report has.
+"""
+import tempfile
+from datetime import date, timedelta
+from typing import IO, Iterator
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.utils import get_column_letter
+
+MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CHUNK_SIZE = 64 * 1024
+
+HEADERS = [
+    "고객사", "서버명", "날짜",
+    "CPU 평균(%)", "CPU 최대(%)",
+    "메모리 평균(%)", "메모리 최대(%)",
+    "디스크 사용률(%)",
+    "네트워크 수신(MB/s)", "네트워크 송신(MB/s)",
+    "디스크 읽기(MB/s)", "디스크 쓰기(MB/s)",
+]
+
+# (metric, stat) for every value column after 고객사/서버명/날짜
+VALUE_COLUMNS = [
+    ("cpu", "avg"), ("cpu", "max"),
+    ("mem", "avg"), ("mem", "max"),
+    ("disk", "avg"),
+    ("net_in", "avg"), ("net_out", "avg"),
+    ("disk_read", "avg"), ("disk_write", "avg"),
+]
+
+# Widest rendered value in a numeric column, e.g. "12345.67"
+VALUE_WIDTH = 8
+MAX_WIDTH = 30
+
+
+def _dates(first: date, last: date) -> list[str]:
+    days = (last - first).days + 1
+    return [(first + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+
+
+def _column_widths(customer_id: str, servers: list[str]) -> list[int]:
+    widths = [
+        len(customer_id),
+        max((len(s) for s in servers), default=0),
+        len("YYYY-MM-DD"),
+    ] + [VALUE_WIDTH] * len(VALUE_COLUMNS)
+    return [min(max(len(h), w) + 2, MAX_WIDTH) for h, w in zip(HEADERS, widths)]
+
+
+def _rows(customer_id: str, stats: dict, servers: list[str], dates: list[str]) -> Iterator[list]:
+    for server in servers:
+        per_metric = [stats.get(metric, {}).get(server, {}) for metric, _ in VALUE_COLUMNS]
+        for dt in dates:
+            row = [customer_id, server, dt]
+            for days, (_, stat) in zip(per_metric, VALUE_COLUMNS):
+                row.append(days.get(dt, {}).get(stat))
+            yield row
+
+
+def write_report(
+    fileobj: IO[bytes], customer_id: str, stats: dict, first: date, last: date
+):
+    """stats: {metric: {server_name: {date: {stat: value}}}}"""
+    servers = sorted(set().union(*stats.values()))
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=f"{first:%Y-%m-%d}~{last:%Y-%m-%d}")
+
+    for col, width in enumerate(_column_widths(customer_id, servers), 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+    ws.freeze_panes = "A2"
+
+    hdr_font = Font(bold=True, color="FFFFFF")
+    hdr_fill = PatternFill(fill_type="solid", fgColor="2563EB")
+    center = Alignment(horizontal="center")
+    header = []
+    for h in HEADERS:
+        cell = WriteOnlyCell(ws, value=h)
+        cell.font = hdr_font
+        cell.fill = hdr_fill
+        cell.alignment = center
+        header.append(cell)
+    ws.append(header)
+
+    for row in _rows(customer_id, stats, servers, _dates(first, last)):
+        ws.append(row)
+
+    wb.save(fileobj)
+
+
+def render_to_tempfile(customer_id: str, stats: dict, first: date, last: date) -> IO[bytes]:
+    """Render into an anonymous temporary file, rewound for reading."""
+    tmp = tempfile.TemporaryFile()
+    try:
+        write_report(tmp, customer_id, stats, first, last)
+        tmp.seek(0)
+    except Exception:
+        tmp.close()
+        raise
+    return tmp
+
+
+def iter_file(fileobj: IO[bytes]) -> Iterator[bytes]:
+    """Yield the file in chunks and close it when done (or when the client goes away)."""
+    try:
+        while chunk := fileobj.read(CHUNK_SIZE):
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+def render_to_path(path: str, customer_id: str, stats: dict, first: date, last: date) -> str:
+    """Process-pool entry point: render one report into path."""
+    with open(path, "wb") as f:
+        write_report(f, customer_id, stats, first, last)
+    return path
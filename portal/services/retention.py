@@ -0,0 +1,209 @@
+"""alert_history retention: drop rows older than each customer's retention_days.
+
+Rows are deleted in small batches, each in its own short transaction, so the
+webhook writer never waits long for the SQLite write lock. Deleted rows are
+already counted in alert_daily_summary (services.alert_rollup keeps it up to
+date as alerts arrive), so the summary is left untouched. Afterwards freed
+pages are returned with PRAGMA incremental_vacuum. Open alerts (not yet
+resolved) are never removed.
+
+incremental_vacuum needs auto_vacuum=INCREMENTAL. New databases get it on
+creation. Databases created before that keep auto_vacuum=NONE, and runs report
+"vacuum": "unavailable" until they are converted once with a full VACUUM.
+Either set RETENTION_ENABLE_VACUUM=1 (the next run converts) or run it during
+a maintenance window:
+
+    cd portal && python -m services.retention --enable-vacuum
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+
+from database import SessionLocal, run_db
+from models import AlertHistory, AlertThreshold
+
+RUN_AT = os.getenv("RETENTION_AT", "01:00")
+BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "2000"))
+BATCH_PAUSE = float(os.getenv("RETENTION_BATCH_PAUSE", "0.05"))
+DEFAULT_DAYS = int(os.getenv("RETENTION_DEFAULT_DAYS", "1095"))  # AlertThreshold 기본값과 동일
+# 기존 DB를 auto_vacuum=INCREMENTAL로 1회 전환 — 전체 VACUUM이라 DB 크기만큼 여유 공간이 필요하고 도는 동안 쓰기가 대기
+ENABLE_VACUUM = os.getenv("RETENTION_ENABLE_VACUUM", "0") == "1"
+
+_AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+_EXPIRED = "customer_id = :cid AND started_ts < :cutoff AND resolved_at IS NOT NULL"
+# (customer_id, started_ts) 인덱스 순서로 BATCH_SIZE개씩 — 정렬/전체 스캔 없이 인덱스 범위만 읽음
+_DELETE = text(
+    f"DELETE FROM alert_history WHERE id IN ("
+    f"SELECT id FROM alert_history WHERE {_EXPIRED} ORDER BY started_ts LIMIT :limit)"
+)
+
+_lock = asyncio.Lock()
+_last_run: Optional[dict] = None
+_task: Optional[asyncio.Task] = None
+
+
+def _policies() -> dict[str, int]:
+    """{customer_id: retention_days} for every customer that has history."""
+    db = SessionLocal()
+    try:
+        days = {t.customer_id: t.retention_days for t in db.query(AlertThreshold)}
+        customers = [r[0] for r in db.query(AlertHistory.customer_id).distinct()]
+    finally:
+        db.close()
+    return {cid: days.get(cid) or DEFAULT_DAYS for cid in customers if cid is not None}
+
+
+def _delete_batch(customer_id: str, cutoff: int) -> int:
+    """Delete up to BATCH_SIZE expired rows in one transaction."""
+    db = SessionLocal()
+    try:
+        deleted = db.execute(_DELETE, {"cid": customer_id, "cutoff": cutoff, "limit": BATCH_SIZE}).rowcount
+        db.commit()
+        return deleted
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def auto_vacuum_mode() -> str:
+    db = SessionLocal()
+    try:
+        return _AUTO_VACUUM_MODES.get(db.execute(text("PRAGMA auto_vacuum")).scalar(), "unknown")
+    finally:
+        db.close()
+
+
+def enable_incremental_vacuum() -> Optional[int]:
+    """Convert the DB to auto_vacuum=INCREMENTAL with a full VACUUM.
+
+    Returns the pages freed, or None if it was already incremental.
+    """
+    db = SessionLocal()
+    try:
+        if db.execute(text("PRAGMA auto_vacuum")).scalar() == 2:
+            return None
+        before = db.execute(text("PRAGMA page_count")).scalar()
+        db.commit()
+        # VACUUM은 트랜잭션 밖에서만 실행됨 — executescript가 먼저 커밋
+        db.connection().connection.driver_connection.executescript(
+            "PRAGMA auto_vacuum=INCREMENTAL; VACUUM;"
+        )
+        # 전환 후 포인터 맵 페이지가 추가되므로 작은 DB에서는 음수가 될 수 있음
+        return max(0, before - db.execute(text("PRAGMA page_count")).scalar())
+    finally:
+        db.close()
+
+
+def _incremental_vacuum() -> tuple[str, Optional[int]]:
+    """(vacuum status, pages freed). Status is "incremental", "enabled" (converted
+    by this run) or "unavailable" (auto_vacuum off and RETENTION_ENABLE_VACUUM unset)."""
+    if auto_vacuum_mode() != "incremental":
+        if not ENABLE_VACUUM:
+            return "unavailable", None
+        return "enabled", enable_incremental_vacuum()
+    db = SessionLocal()
+    try:
+        before = db.execute(text("PRAGMA freelist_count")).scalar()
+        db.commit()
+        # sqlite3의 execute()는 첫 step(1페이지)만 실행 — executescript는 끝까지 진행
+        db.connection().connection.driver_connection.executescript("PRAGMA incremental_vacuum;")
+        return "incremental", before - db.execute(text("PRAGMA freelist_count")).scalar()
+    finally:
+        db.close()
+
+
+async def _compact() -> dict:
+    global _last_run
+    now = int(time.time())
+    result = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "deleted": 0,
+        "per_customer": {},
+        "vacuum": None,
+        "vacuumed_pages": None,
+        "duration_seconds": None,
+        "error": None,
+    }
+    t0 = time.monotonic()
+    try:
+        for customer_id, days in (await run_db(_policies)).items():
+            cutoff = now - days * 86400
+            removed = 0
+            while True:
+                n = await run_db(_delete_batch, customer_id, cutoff)
+                removed += n
+                if n < BATCH_SIZE:
+                    break
+                await asyncio.sleep(BATCH_PAUSE)  # 배치 사이에 다른 writer에게 잠금을 양보
+            if removed:
+                result["per_customer"][customer_id] = removed
+                result["deleted"] += removed
+        result["vacuum"], result["vacuumed_pages"] = await run_db(_incremental_vacuum)
+        if result["vacuum"] == "unavailable":
+            print(
+                "[portal] alert retention: auto_vacuum is off, freed pages stay in the DB file "
+                "(set RETENTION_ENABLE_VACUUM=1 or run python -m services.retention --enable-vacuum)"
+            )
+    except Exception as e:
+        result["error"] = str(e) or e.__class__.__name__
+        raise
+    finally:
+        result["duration_seconds"] = round(time.monotonic() - t0, 2)
+        _last_run = result
+    return result
+
+
+async def run() -> dict:
+    """Scheduler entry point; concurrent calls wait for the running compaction."""
+    async with _lock:
+        return await _compact()
+
+
+async def _run_logged():
+    try:
+        await run()
+    except Exception as e:
+        print(f"[portal] alert retention failed: {e}")
+
+
+def start_now() -> bool:
+    """Run a compaction in the background; False if one is already running."""
+    global _task
+    if running():
+        return False
+    _task = asyncio.create_task(_run_logged())
+    return True
+
+
+def running() -> bool:
+    return _lock.locked()
+
+
+def last_run() -> Optional[dict]:
+    return _last_run
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="alert_history retention maintenance")
+    parser.add_argument(
+        "--enable-vacuum", action="store_true",
+        help="convert the DB to auto_vacuum=INCREMENTAL (full VACUUM; stop the portal first)",
+    )
+    args = parser.parse_args()
+    if args.enable_vacuum:
+        t0 = time.monotonic()
+        freed = enable_incremental_vacuum()
+        if freed is None:
+            print("auto_vacuum is already INCREMENTAL")
+        else:
+            print(f"auto_vacuum=INCREMENTAL enabled, {freed} pages freed in {time.monotonic() - t0:.1f}s")
+    else:
+        print(f"auto_vacuum={auto_vacuum_mode()}")
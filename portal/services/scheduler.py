@@ -0,0 +1,55 @@
+"""Minimal in-process scheduler for daily maintenance jobs (KST wall clock)."""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+TZ_KST = timezone(timedelta(hours=9))
+
+_jobs: list[tuple[str, str, Callable[[], Awaitable]]] = []
+_tasks: list[asyncio.Task] = []
+
+
+def daily(name: str, at: str, job: Callable[[], Awaitable]):
+    """Register job to run every day at "HH:MM" KST. Call before start()."""
+    datetime.strptime(at, "%H:%M")  # validate early
+    _jobs.append((name, at, job))
+
+
+def _seconds_until(at: str) -> float:
+    hour, minute = (int(x) for x in at.split(":"))
+    now = datetime.now(TZ_KST)
+    run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if run <= now:
+        run += timedelta(days=1)
+    return (run - now).total_seconds()
+
+
+async def _loop(name: str, at: str, job: Callable[[], Awaitable]):
+    while True:
+        await asyncio.sleep(_seconds_until(at))
+        t0 = time.monotonic()
+        try:
+            await job()
+            print(f"[portal] job {name} done in {time.monotonic() - t0:.1f}s")
+        except Exception as e:
+            print(f"[portal] job {name} failed: {e}")
+
+
+def start():
+    if _tasks:
+        return
+    for name, at, job in _jobs:
+        _tasks.append(asyncio.create_task(_loop(name, at, job)))
+
+
+async def stop():
+    for task in _tasks:
+        task.cancel()
+    for task in _tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    _tasks.clear()
+    _jobs.clear()
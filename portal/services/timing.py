@@ -0,0 +1,101 @@
+"""Per-request timing breakdown, sent back as a Server-Timing header.
+
+The middleware opens a collector for each request. Routers and services add
+named spans to it, via span() or record(). Spans with the same name add up,
+and concurrent ones (asyncio.gather over several VictoriaMetrics queries)
+count each call's own duration. Browser devtools show the header under
+Network → Timing. With ACCESS_LOG_JSON=1 the same breakdown is printed as one
+JSON line per request.
+
+Spans recorded after the response has started (streaming bodies) are not in
+the header but are in the access-log line.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+ENABLED = os.getenv("SERVER_TIMING", "1") == "1"
+ACCESS_LOG_JSON = os.getenv("ACCESS_LOG_JSON", "0") == "1"
+
+
+class Timings:
+    def __init__(self):
+        self.spans: dict[str, list[float]] = {}  # name → [seconds, count]
+        self._lock = threading.Lock()  # DB 스레드에서도 기록됨
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            acc = self.spans.setdefault(name, [0.0, 0])
+            acc[0] += seconds
+            acc[1] += 1
+
+    def header(self, total: float) -> str:
+        parts = [
+            f'{name};dur={seconds * 1000:.1f};desc="{count}x"'
+            for name, (seconds, count) in self.spans.items()
+        ]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[Timings]] = ContextVar("timings", default=None)
+
+
+def record(name: str, seconds: float):
+    """Add a finished span to the current request (no-op outside a request)."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def span(name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - t0)
+
+
+class TimingMiddleware:
+    """ASGI middleware: collects spans per request and adds the Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (ENABLED or ACCESS_LOG_JSON):
+            return await self.app(scope, receive, send)
+        timings = Timings()
+        token = _current.set(timings)
+        t0 = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if ENABLED:
+                    header = timings.header(time.perf_counter() - t0).encode()
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if ACCESS_LOG_JSON:
+                route = scope.get("route")
+                print(json.dumps({
+                    "ts": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(route, "path", None),
+                    "status": status,
+                    "duration_ms": round((time.perf_counter() - t0) * 1000, 1),
+                    "spans": {n: {"ms": round(s * 1000, 1), "count": c} for n, (s, c) in timings.spans.items()},
+                }, ensure_ascii=False), flush=True)
@@ -1,19 +1,32 @@
 import os
+import asyncio
 from datetime import datetime, timezone
 from typing import Optional
 import httpx
 
-VM_URL = os.getenv("VICTORIAMETRICS_URL", "http://victoriametrics:8428")
-TIMEOUT = 5.0
+from services import upstream
+
+RANGE_CONCURRENCY = int(os.getenv("REPORT_QUERY_CONCURRENCY", "8"))
+RANGE_CHUNK_SECONDS = int(os.getenv("REPORT_CHUNK_DAYS", "31")) * 86400
+RANGE_RETRIES = int(os.getenv("REPORT_CHUNK_RETRIES", "2"))
+RANGE_TIMEOUT = 60.0
+
+_range_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _client() -> httpx.AsyncClient:
+    return upstream.get_client(upstream.VICTORIAMETRICS)
 
 
 async def get_customers() -> list[str]:
     try:
-        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            resp = await client.get(f"{VM_URL}/api/v1/label/customer_id/values")
-            resp.raise_for_status()
-            data = resp.json()
-            return [c for c in data.get("data", []) if c]
+        # node_uname_info로 한정 — 포털이 기록하는 msp_threshold 등은 제외
+        resp = await _client().get(
+            "/api/v1/label/customer_id/values", params={"match[]": "node_uname_info"}
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        return [c for c in data.get("data", []) if c]
     except httpx.TimeoutException:
         raise Exception("VictoriaMetrics timeout")
     except httpx.HTTPError as e:
@@ -23,50 +36,75 @@ async def get_customers() -> list[str]:
 async def get_all_series() -> list[dict]:
     """Get all server series from node_uname_info."""
     try:
-        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            resp = await client.get(
-                f"{VM_URL}/api/v1/series",
-                params={"match[]": "node_uname_info"}
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            servers = []
-            seen = set()
-            for s in data.get("data", []):
-                key = (s.get("customer_id", ""), s.get("server_name", ""))
-                if key not in seen and key[0] and key[1]:
-                    seen.add(key)
-                    servers.append({
-                        "customer_id": key[0],
-                        "server_name": key[1],
-                    })
-            return servers
+        resp = await _client().get(
+            "/api/v1/series",
+            params={"match[]": "node_uname_info"}
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        servers = []
+        seen = set()
+        for s in data.get("data", []):
+            key = (s.get("customer_id", ""), s.get("server_name", ""))
+            if key not in seen and key[0] and key[1]:
+                seen.add(key)
+                servers.append({
+                    "customer_id": key[0],
+                    "server_name": key[1],
+                })
+        return servers
     except Exception as e:
         raise Exception(f"VictoriaMetrics error: {e}")
 
 
-async def get_server_last_seen(customer_id: str, server_name: str) -> Optional[str]:
-    """Get last metric timestamp for a server."""
+async def get_fleet_last_seen() -> dict[tuple[str, str], str]:
+    """Last metric timestamp for every server in one instant query.
+
+    Returns {(customer_id, server_name): iso timestamp}. Servers without a
+    recent sample are absent from the result. Errors are raised, so the fleet
+    snapshot keeps its previous data instead of showing every server offline.
+    """
     try:
-        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            resp = await client.get(
-                f"{VM_URL}/api/v1/query",
-                params={
-                    "query": f'node_uname_info{{customer_id="{customer_id}",server_name="{server_name}"}}'
-                }
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            results = data.get("data", {}).get("result", [])
-            if not results:
-                return None
-            ts = results[0]["value"][0]
-            return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
-    except Exception:
-        return None
+        resp = await _client().get(
+            "/api/v1/query",
+            params={"query": "max by(customer_id, server_name)(timestamp(node_uname_info))"},
+        )
+        resp.raise_for_status()
+        data = resp.json()
+    except httpx.TimeoutException:
+        raise Exception("VictoriaMetrics timeout")
+    except httpx.HTTPError as e:
+        raise Exception(f"VictoriaMetrics error: {e}")
+
+    last_seen = {}
+    for r in data.get("data", {}).get("result", []):
+        metric = r.get("metric", {})
+        key = (metric.get("customer_id", ""), metric.get("server_name", ""))
+        if not key[0] or not key[1]:
+            continue
+        try:
+            ts = float(r["value"][1])
+        except (KeyError, IndexError, ValueError, TypeError):
+            continue
+        last_seen[key] = datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+    return last_seen
+
+
+async def get_fleet_snapshot() -> list[dict]:
+    """All servers with their last_seen, fetched with two requests in total.
+
+    Returns [{ customer_id, server_name, last_seen, online }]. online is
+    evaluated once here, at fetch time.
+    """
+    servers, last_seen = await asyncio.gather(get_all_series(), get_fleet_last_seen())
+    result = []
+    for s in servers:
+        seen = last_seen.get((s["customer_id"], s["server_name"]))
+        result.append({**s, "last_seen": seen, "online": server_online(seen)})
+    return result
 
 
-async def is_server_online(last_seen: Optional[str]) -> bool:
+def server_online(last_seen: Optional[str]) -> bool:
     if not last_seen:
         return False
     try:
@@ -80,12 +118,12 @@ async def is_server_online(last_seen: Optional[str]) -> bool:
 async def delete_series(customer_id: str, server_name: str) -> bool:
     """Delete all metrics for a server from VictoriaMetrics."""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.post(
-                f"{VM_URL}/api/v1/admin/tsdb/delete_series",
-                params={"match[]": f'{{customer_id="{customer_id}",server_name="{server_name}"}}'}
-            )
-            return resp.status_code in (204, 200)
+        resp = await _client().post(
+            "/api/v1/admin/tsdb/delete_series",
+            params={"match[]": f'{{customer_id="{customer_id}",server_name="{server_name}"}}'},
+            timeout=10.0,
+        )
+        return resp.status_code in (204, 200)
     except Exception:
         return False
 
@@ -96,12 +134,11 @@ async def get_customer_avg_cpu(customer_id: str) -> float:
         f'(rate(node_cpu_seconds_total{{mode="idle",customer_id="{customer_id}"}}[5m])) * 100)'
     )
     try:
-        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            resp = await client.get(f"{VM_URL}/api/v1/query", params={"query": query})
-            data = resp.json()
-            results = data.get("data", {}).get("result", [])
-            if results:
-                return round(float(results[0]["value"][1]), 1)
+        resp = await _client().get("/api/v1/query", params={"query": query})
+        data = resp.json()
+        results = data.get("data", {}).get("result", [])
+        if results:
+            return round(float(results[0]["value"][1]), 1)
     except Exception:
         pass
     return 0.0
@@ -113,12 +150,87 @@ async def get_customer_avg_memory(customer_id: str) -> float:
         f' / node_memory_MemTotal_bytes{{customer_id="{customer_id}"}}) * 100)'
     )
     try:
-        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            resp = await client.get(f"{VM_URL}/api/v1/query", params={"query": query})
-            data = resp.json()
-            results = data.get("data", {}).get("result", [])
-            if results:
-                return round(float(results[0]["value"][1]), 1)
+        resp = await _client().get("/api/v1/query", params={"query": query})
+        data = resp.json()
+        results = data.get("data", {}).get("result", [])
+        if results:
+            return round(float(results[0]["value"][1]), 1)
     except Exception:
         pass
     return 0.0
+
+
+async def query_instant(query: str, time: Optional[int] = None) -> list:
+    params = {"query": query}
+    if time is not None:
+        params["time"] = time
+    resp = await _client().get("/api/v1/query", params=params, timeout=RANGE_TIMEOUT)
+    resp.raise_for_status()
+    return resp.json().get("data", {}).get("result", [])
+
+
+async def query_range(
+    query: str, start: int, end: int, step: int = 3600, align: bool = True
+) -> list:
+    """align=False sends nocache=1 so VictoriaMetrics keeps start as given
+    instead of rounding it to a multiple of step (needed for KST-midnight days)."""
+    params = {"query": query, "start": start, "end": end, "step": step}
+    if not align:
+        params["nocache"] = 1
+    resp = await _client().get("/api/v1/query_range", params=params, timeout=RANGE_TIMEOUT)
+    resp.raise_for_status()
+    return resp.json().get("data", {}).get("result", [])
+
+
+def _range_chunks(start: int, end: int, step: int) -> list[tuple[int, int]]:
+    """Split [start, end] into step-aligned chunks that don't overlap."""
+    size = max(step, RANGE_CHUNK_SECONDS - RANGE_CHUNK_SECONDS % step)
+    chunks = []
+    cur = start
+    while cur <= end:
+        chunk_end = min(cur + size - step, end)
+        chunks.append((cur, chunk_end))
+        cur = chunk_end + step
+    return chunks
+
+
+async def _query_range_chunk(query: str, start: int, end: int, step: int, align: bool) -> list:
+    global _range_semaphore
+    if _range_semaphore is None:
+        _range_semaphore = asyncio.Semaphore(RANGE_CONCURRENCY)
+    for attempt in range(RANGE_RETRIES + 1):
+        try:
+            async with _range_semaphore:
+                return await query_range(query, start, end, step, align)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code < 500 or attempt == RANGE_RETRIES:
+                raise
+        except httpx.TransportError:
+            if attempt == RANGE_RETRIES:
+                raise
+        await asyncio.sleep(0.5 * 2 ** attempt)
+
+
+async def query_range_chunked(
+    query: str, start: int, end: int, step: int = 3600, align: bool = True
+) -> list:
+    """query_range split into time chunks fetched concurrently, each retried on its own.
+
+    Concurrency across all callers is capped by REPORT_QUERY_CONCURRENCY.
+    """
+    chunks = _range_chunks(start, end, step)
+    parts = await asyncio.gather(
+        *(_query_range_chunk(query, s, e, step, align) for s, e in chunks)
+    )
+    if len(parts) == 1:
+        return parts[0]
+
+    merged: dict[tuple, dict] = {}
+    for part in parts:
+        for r in part:
+            key = tuple(sorted(r.get("metric", {}).items()))
+            if key in merged:
+                merged[key]["values"].extend(r.get("values", []))
+            else:
+                merged[key] = {"metric": r.get("metric", {}), "values": list(r.get("values", []))}
+    return list(merged.values())
@@ -1,12 +1,26 @@
+import asyncio
 import os
-import httpx
-import yaml
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from database import SessionLocal, run_db
+from models import AlertThreshold
+from services import upstream
+from services import victoriametrics as vm
 from services.docker_mgr import restart_container
+from services.config_apply import DebouncedApplier
 
 CONFIG_DIR = os.getenv("CONFIG_DIR", "/monitoring_msp/config")
-VMALERT_URL = os.getenv("VMALERT_URL", "http://vmalert:8180")
 DEFAULT_THRESHOLDS = {"cpu": 90, "memory": 90, "disk": 90}
 
+# groups: 고객사별 룰 그룹 (임계치가 룰에 들어감)
+# series: 임계치를 msp_threshold 시계열로 VictoriaMetrics에 기록하고 고정된 4개 룰에서 조인
+THRESHOLD_MODE = os.getenv("VMALERT_THRESHOLD_MODE", "groups")
+THRESHOLD_PUBLISH_INTERVAL = float(os.getenv("THRESHOLD_PUBLISH_INTERVAL", "60"))
+# 룰에서 마지막 값을 찾는 구간 — 발행 주기보다 충분히 길게. 삭제된 고객사는 이 시간 후 알림에서 빠짐
+THRESHOLD_LOOKBACK = os.getenv("THRESHOLD_LOOKBACK", "10m")
+
 
 def get_vmalert_rules_path() -> str:
     path = os.path.join(CONFIG_DIR, "vmalert", "rules", "host-alerts.yml")
@@ -101,18 +115,209 @@ def generate_vmalert_rules(customers_thresholds: list[dict]) -> str:
             f"host-alerts-{c['customer_id']}", cf, c["cpu"], c["memory"], c["disk"]
         ))
 
+    import yaml  # 설정 생성 시에만 로드
+
     return yaml.dump({"groups": groups}, default_flow_style=False, allow_unicode=True)
 
 
-async def apply_vmalert_rules(customers_thresholds: list[dict]) -> bool:
-    path = get_vmalert_rules_path()
-    content = generate_vmalert_rules(customers_thresholds)
-    with open(path, "w") as f:
-        f.write(content)
+def _threshold(resource: str) -> str:
+    """Per-customer threshold, one series per customer_id."""
+    return (
+        f'max by(customer_id) (last_over_time(msp_threshold{{resource="{resource}"}}[{THRESHOLD_LOOKBACK}]))'
+    )
+
+
+def generate_series_rules() -> str:
+    """Fixed rules comparing usage to msp_threshold; independent of the number of customers."""
+    fs = 'fstype!~"tmpfs|devtmpfs|overlay|squashfs"'
+    rules = [
+        {
+            "alert": "HighCPU",
+            "expr": (
+                '(100 - avg by(customer_id, server_name) '
+                '(rate(node_cpu_seconds_total{mode="idle"}[5m])) * 100)'
+                f' > on(customer_id) group_left() {_threshold("cpu")}'
+            ),
+            "for": "3m",
+            "labels": {"severity": "warning"},
+            "annotations": {
+                "summary": "High CPU on {{ $labels.server_name }}",
+                "description": "CPU {{ $value | printf \"%.1f\" }}% above the customer threshold for 3 minutes",
+            },
+        },
+        {
+            "alert": "HighMemory",
+            "expr": (
+                "(1 - node_memory_MemAvailable_bytes / node_memory_MemTotal_bytes) * 100"
+                f' > on(customer_id) group_left() {_threshold("memory")}'
+            ),
+            "for": "3m",
+            "labels": {"severity": "warning"},
+            "annotations": {
+                "summary": "High memory on {{ $labels.server_name }}",
+                "description": "Memory {{ $value | printf \"%.1f\" }}% above the customer threshold for 3 minutes",
+            },
+        },
+        {
+            "alert": "HighDisk",
+            "expr": (
+                f"(1 - node_filesystem_avail_bytes{{{fs}}} / node_filesystem_size_bytes{{{fs}}}) * 100"
+                f' > on(customer_id) group_left() {_threshold("disk")}'
+            ),
+            "for": "3m",
+            "labels": {"severity": "warning"},
+            "annotations": {
+                "summary": "High disk on {{ $labels.server_name }}",
+                "description": "Disk {{ $value | printf \"%.1f\" }}% above the customer threshold for 3 minutes",
+            },
+        },
+        {
+            "alert": "ServerDown",
+            "expr": (
+                "(time() - max by (customer_id, server_name) (timestamp(node_uname_info))) > 300"
+                f' and on(customer_id) {_threshold("cpu")}'
+            ),
+            "for": "0m",
+            "labels": {"severity": "critical"},
+            "annotations": {
+                "summary": "Server {{ $labels.server_name }} is down",
+                "description": "No metrics received for more than 3 minutes",
+            },
+        },
+    ]
+    import yaml  # 설정 생성 시에만 로드
+
+    return yaml.dump(
+        {"groups": [{"name": "host-alerts", "rules": rules}]},
+        default_flow_style=False, allow_unicode=True,
+    )
+
+
+def _render_rules(customers_thresholds: list[dict]) -> str:
+    if THRESHOLD_MODE == "series":
+        return generate_series_rules()
+    return generate_vmalert_rules(customers_thresholds)
+
+
+async def _reload() -> bool:
     # Hot-reload instead of restart (preserves pending alert state)
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.post(f"{VMALERT_URL}/-/reload")
-            return resp.status_code == 200
+        resp = await upstream.get_client(upstream.VMALERT).post("/-/reload")
+        return resp.status_code == 200
     except Exception:
         return await restart_container("msp-vmalert")
+
+
+async def _current_thresholds() -> list[dict]:
+    if THRESHOLD_MODE == "series":
+        return []  # 룰 파일이 임계치와 무관
+    return await run_db(_load_thresholds)
+
+
+applier = DebouncedApplier(
+    "vmalert", get_vmalert_rules_path, _current_thresholds, _render_rules, _reload,
+)
+
+
+def request_apply() -> dict:
+    """Debounced apply of the thresholds in the DB; see services.config_apply. Returns the apply status.
+
+    In series mode the rules file never changes, so this only republishes thresholds.
+    """
+    if THRESHOLD_MODE == "series":
+        _publish_now.set()
+    return applier.request()
+
+
+def apply_status() -> dict:
+    status = applier.status()
+    if THRESHOLD_MODE == "series":
+        status["threshold_series"] = dict(_publish_status)
+    return status
+
+
+# --- threshold series (VMALERT_THRESHOLD_MODE=series) ---------------------------
+
+_publish_task: Optional[asyncio.Task] = None
+_publish_now = asyncio.Event()
+_publish_status: dict = {"last_published_at": None, "customers": 0, "error": None}
+
+
+def _load_thresholds() -> list[dict]:
+    db = SessionLocal()
+    try:
+        return [
+            {"customer_id": t.customer_id, "cpu": t.cpu, "memory": t.memory, "disk": t.disk}
+            for t in db.query(AlertThreshold).all()
+        ]
+    finally:
+        db.close()
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def threshold_lines(customers_thresholds: list[dict], ts_ms: int) -> str:
+    """Prometheus text exposition lines for msp_threshold."""
+    return "".join(
+        f'msp_threshold{{customer_id="{_label(c["customer_id"])}",resource="{resource}"}} {c[resource]} {ts_ms}\n'
+        for c in customers_thresholds
+        for resource in ("cpu", "memory", "disk")
+    )
+
+
+async def publish_thresholds():
+    """Write every customer's thresholds to VictoriaMetrics.
+
+    Same coverage as the group rules: only registered customers, or every
+    customer at the defaults when none are registered.
+    """
+    thresholds = await run_db(_load_thresholds)
+    if not thresholds:
+        thresholds = [{"customer_id": cid, **DEFAULT_THRESHOLDS} for cid in await vm.get_customers()]
+    body = threshold_lines(thresholds, int(time.time() * 1000))
+    if body:
+        resp = await upstream.get_client(upstream.VICTORIAMETRICS).post(
+            "/api/v1/import/prometheus", content=body.encode(),
+        )
+        resp.raise_for_status()
+    _publish_status.update(
+        last_published_at=datetime.now(timezone.utc).isoformat(),
+        customers=len(thresholds), error=None,
+    )
+
+
+async def _publish_loop():
+    while True:
+        _publish_now.clear()
+        try:
+            await publish_thresholds()
+        except Exception as e:
+            _publish_status["error"] = str(e) or e.__class__.__name__
+            print(f"[portal] threshold publish failed: {e}")
+        try:
+            await asyncio.wait_for(_publish_now.wait(), THRESHOLD_PUBLISH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start():
+    """Series mode: write the (static) rules once and keep thresholds published."""
+    global _publish_task
+    if THRESHOLD_MODE != "series" or _publish_task is not None:
+        return
+    applier.request()
+    _publish_task = asyncio.create_task(_publish_loop())
+
+
+async def stop():
+    global _publish_task
+    if _publish_task is not None:
+        _publish_task.cancel()
+        try:
+            await _publish_task
+        except asyncio.CancelledError:
+            pass
+        _publish_task = None
+    await applier.stop()